@@ -32,6 +32,7 @@ setup(
     include_package_data=True,
     zip_safe=False,
     install_requires=["requests", "matplotlib"],
+    extras_require={"numba": ["numba", "numpy"]},
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Environment :: Console",
@@ -1,10 +1,52 @@
+import argparse
+import json
 import pathlib
-from typing import Any, Callable, Dict, Iterable, Iterator, List, NoReturn, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NoReturn,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import matplotlib.pyplot as plt
 
+from . import diff
+from .aggregate import GroupAggregator, WeaponsRange
+from .backends import backend_names, benchmark, get_backend
+from .inverse import rank_min_points
 from .loaders import Loader
-from .weapons import Weapon, WeaponInfusion, WeaponType
+from .marginal import STATS, marginal_values
+from .store import ResultStore
+from .sweeps import (
+    STARTING_CLASSES,
+    BatchStats,
+    Checkpoint,
+    ShardDirectory,
+    catalogue_levels,
+    find_levels_bases,
+    infusion_ars_entry,
+    merge_shards,
+    parse_shard,
+    run_shard,
+    run_sweep,
+    stream_ars,
+    work,
+)
+from .weapons import (
+    AR,
+    Levels,
+    Weapon,
+    WeaponInfusion,
+    WeaponType,
+    dedup_ratio,
+    group_infusions,
+)
 
 CATEGORY20 = tuple(
     "#1f77b4 #aec7e8 #ff7f0e #ffbb78 #2ca02c #98df8a #d62728 #ff9896 #9467bd #c5b0d5 "
@@ -12,6 +54,9 @@ CATEGORY20 = tuple(
 )
 
 
+BASE_LEVELS = (10, 10, 10, 10, 10)
+
+
 def infusions(weapons: Iterable[Weapon], level: Tuple[int, int, int, int, int], n: int):
     return [i for weapon in weapons for i in weapon.max_level(level, n)]
 
@@ -30,23 +75,18 @@ def _old(weapons):
             )
 
 
-WeaponInfusions = Dict[str, List[int]]
-WeaponsRange = Dict[str, List[Tuple[int, int]]]
-Levels = Dict[str, Dict[str, WeaponInfusions]]
+WeaponInfusions = Dict[str, List[AR]]
 
 
-def find_levels(weapons: List[Weapon], levels: Any) -> Levels:
-    default = [None] * len(levels)
-    weapon_ars = {}
-    for i, level in enumerate(levels):
-        for ar, _, infusion in infusions(weapons, (10, 10, 10, 10, 10), level):
-            if ar == 0:
-                ar = None
-            (
-                weapon_ars.setdefault(infusion.weapon.type.name, {})
-                .setdefault(infusion.weapon.name, {})
-                .setdefault(infusion.infusion.name, list(default))[i]
-            ) = ar
+def find_levels(
+    weapons: List[Weapon],
+    levels: Any,
+    backend: Optional[str] = None,
+    store: Optional[ResultStore] = None,
+) -> Levels:
+    weapon_ars = catalogue_levels(weapons, len(levels))
+    for infusion, ars in stream_ars(weapons, levels, BASE_LEVELS, backend, store):
+        infusion_ars_entry(weapon_ars, infusion, len(levels))[:] = ars
     return weapon_ars
 
 
@@ -57,18 +97,7 @@ def extract_item_data(levels: Levels) -> Iterator[Tuple[str, WeaponInfusions]]:
 
 
 def extract_groups_data(levels: Levels) -> Iterator[Tuple[str, WeaponsRange]]:
-    for weapon_type_key, weapons in levels.items():
-        values = {
-            weapon_name: [
-                (
-                    max([a for a in ars if a is not None], default=None),
-                    min([a for a in ars if a is not None], default=None),
-                )
-                for ars in zip(*weapon.values())
-            ]
-            for weapon_name, weapon in weapons.items()
-        }
-        yield WeaponType[weapon_type_key].value, values
+    return GroupAggregator.from_levels(levels).groups()
 
 
 def plot(
@@ -101,26 +130,441 @@ def plot(
         plt.close(fig)
 
 
-def main():
+def weapon_infusion(name: str) -> WeaponInfusion:
+    try:
+        return WeaponInfusion[name.upper()]
+    except KeyError:
+        choices = ", ".join(i.name.lower() for i in WeaponInfusion)
+        raise argparse.ArgumentTypeError(
+            f"unknown infusion {name!r}, choose from {choices}"
+        ) from None
+
+
+def stat_level(value: str) -> int:
+    level = int(value)
+    if not 1 <= level <= 99:
+        raise argparse.ArgumentTypeError(f"stats must be between 1 and 99, got {level}")
+    return level
+
+
+def add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--type",
+        dest="types",
+        action="append",
+        type=WeaponType,
+        metavar="TYPE",
+        help="only load weapons of this type, e.g. Katana",
+    )
+    parser.add_argument(
+        "--name", dest="names", action="append", help="only load this weapon"
+    )
+    parser.add_argument(
+        "--infusion",
+        dest="only",
+        action="append",
+        type=weapon_infusion,
+        metavar="INFUSION",
+        help="only build this infusion, e.g. sharp",
+    )
+
+
+def load_weapons(args: argparse.Namespace) -> List[Weapon]:
+    return list(
+        Loader.load_weapons(types=args.types, names=args.names, infusions=args.only)
+    )
+
+
+IMAGES = pathlib.Path("./.darksouls/images/")
+
+
+def render_groups(
+    domain: Any,
+    groups: Iterator[Tuple[str, WeaponsRange]],
+    base_path: pathlib.Path = IMAGES,
+) -> None:
+    plot(domain, groups, lambda i, _: CATEGORY20[i % 20], base_path / "categories")
+
+
+def render(domain: Any, levels: Levels, base_path: pathlib.Path = IMAGES) -> None:
     inf_colors = {
         infusion.name: CATEGORY20[i] for i, infusion in enumerate(WeaponInfusion)
     }
-
-    weapons = list(Loader.load_weapons())
-    domain = range(0, 20)
-    levels = find_levels(weapons, domain)
-    plot(
-        domain,
-        extract_groups_data(levels),
-        lambda i, _: CATEGORY20[i % 20],
-        pathlib.Path("./.darksouls/images/categories/"),
-    )
+    render_groups(domain, extract_groups_data(levels), base_path)
     plot(
         domain,
         extract_item_data(levels),
         lambda _, inf: inf_colors[inf],
-        pathlib.Path("./.darksouls/images/weapons/"),
+        base_path / "weapons",
+    )
+
+
+def add_store_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--no-store",
+        dest="store",
+        action="store_false",
+        help="recompute everything instead of reusing stored results",
+    )
+    parser.add_argument(
+        "--store-size", type=int, help="evict stored results beyond this many MiB"
+    )
+
+
+def result_store(args: argparse.Namespace) -> Optional[ResultStore]:
+    if not args.store:
+        return None
+    if args.store_size is None:
+        return ResultStore()
+    return ResultStore(max_bytes=args.store_size * 1024 * 1024)
+
+
+def store_command(args: argparse.Namespace) -> None:
+    store = result_store(args)
+    if args.action == "clear":
+        print(f"Removed {store.clear()} stored results from {store.path}")
+        return
+    count, size = store.info()
+    print(f"{count} stored results, {size / 1024:.1f} KiB in {store.path}")
+    if args.action == "prune":
+        print(f"Evicted {store.prune()} stored results")
+
+
+def plot_command(args: argparse.Namespace) -> None:
+    weapons = load_weapons(args)
+    groups = group_infusions(weapons)
+    print(
+        f"Optimizing {len(groups)} unique infusions for "
+        f"{sum(map(len, groups.values()))} weapon infusions "
+        f"({dedup_ratio(groups):.1%} deduplicated)"
+    )
+    domain = range(0, args.levels)
+    if args.checkpoint is None:
+        levels = find_levels(weapons, domain, args.backend, result_store(args))
+    else:
+        levels = run_sweep(
+            weapons,
+            domain,
+            BASE_LEVELS,
+            Checkpoint(args.checkpoint),
+            args.chunk_size,
+            args.backend,
+        )
+    render(domain, levels)
+
+
+def groups_command(args: argparse.Namespace) -> None:
+    domain = range(0, args.levels)
+    weapons = load_weapons(args)
+    aggregator = (
+        GroupAggregator(len(domain))
+        .reserve(weapons)
+        .consume(
+            stream_ars(weapons, domain, BASE_LEVELS, args.backend, result_store(args))
+        )
+    )
+    if args.export is not None:
+        with args.export.open("w") as f:
+            json.dump(dict(aggregator.groups()), f)
+    render_groups(domain, aggregator.groups())
+
+
+def diff_command(args: argparse.Namespace) -> None:
+    old = diff.load_catalogue(args.old)
+    new = diff.load_catalogue(args.new)
+    changes = diff.CatalogueDiff.from_catalogues(old, new)
+    domain = range(0, args.levels)
+    old_ids = set(changes.removed + changes.affected)
+    new_ids = set(changes.recompute)
+    old_levels = find_levels(
+        list(Loader.from_data([w for w in old[0] if w["id"] in old_ids], old[1])),
+        domain,
+    )
+    new_levels = find_levels(
+        list(Loader.from_data([w for w in new[0] if w["id"] in new_ids], new[1])),
+        domain,
+    )
+    print(
+        diff.report(changes, diff.compare_levels(old_levels, new_levels, len(domain)))
+    )
+    if args.results is not None:
+        with args.results.open() as f:
+            results = json.load(f)
+        layout = catalogue_levels(Loader.from_data(*new), len(domain))
+        new_levels = diff.update_levels(results, old_levels, new_levels, layout)
+    if args.output is not None:
+        with args.output.open("w") as f:
+            json.dump(new_levels, f)
+
+
+def bench_command(args: argparse.Namespace) -> None:
+    weapons = load_weapons(args)
+    infusions = [members[0] for members in group_infusions(weapons).values()][
+        : args.infusions
+    ]
+    timings = benchmark(infusions, BASE_LEVELS, args.points, args.backends)
+    for points, times in timings.items():
+        baseline = times.get("enumerate")
+        print(f"{points} points:")
+        for name, duration in times.items():
+            speed_up = f" ({baseline / duration:.1f}x)" if baseline else ""
+            print(f"  {name}: {duration:.3f}s{speed_up}")
+
+
+def target_command(args: argparse.Namespace) -> None:
+    results = rank_min_points(
+        load_weapons(args), args.base, args.ar, get_backend(args.backend)
     )
+    for result in results[: args.top]:
+        infusion = result.infusion
+        weapon = infusion.weapon
+        levels = [level for _, level in result.ties]
+        print(
+            f"{result.points}: {weapon.name}[{infusion.infusion.name}]"
+            f"[{weapon.type.value}] AR {result.ar} -> {levels}"
+        )
+
+
+def shard_command(args: argparse.Namespace) -> None:
+    index, count = args.shard
+    path = run_shard(
+        load_weapons(args),
+        range(0, args.levels),
+        BASE_LEVELS,
+        ShardDirectory(args.dir, count),
+        index,
+        args.chunk_size,
+        args.backend,
+    )
+    print(f"Wrote {path}")
+
+
+def work_command(args: argparse.Namespace) -> None:
+    done = work(
+        load_weapons(args),
+        range(0, args.levels),
+        BASE_LEVELS,
+        ShardDirectory(args.dir, args.count),
+        args.chunk_size,
+        args.backend,
+        args.stale,
+    )
+    print(f"Completed shards: {done}")
+
+
+def merge_command(args: argparse.Namespace) -> None:
+    domain = range(0, args.levels)
+    try:
+        levels = merge_shards(
+            load_weapons(args),
+            domain,
+            BASE_LEVELS,
+            ShardDirectory(args.dir, args.count),
+        )
+    except ValueError as error:
+        raise SystemExit(f"merge: {error}") from None
+    if args.output is not None:
+        with args.output.open("w") as f:
+            json.dump(levels, f)
+    render(domain, levels)
+
+
+def add_sweep_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--dir", type=pathlib.Path, required=True)
+    parser.add_argument("--levels", type=int, default=20)
+    add_filter_arguments(parser)
+
+
+def advise_command(args: argparse.Namespace) -> None:
+    values = marginal_values(load_weapons(args), args.stats)
+    for value in values[: args.top]:
+        infusion = value.infusion
+        gains = ", ".join(
+            f"{STATS[i]} {value.gains[i]:+d}"
+            for i in sorted(range(5), key=lambda i: value.gains[i], reverse=True)
+            if value.gains[i]
+        )
+        print(
+            f"{STATS[value.best]}: {infusion.weapon.name}[{infusion.infusion.name}] "
+            f"AR {value.ar} ({gains or 'no gain'})"
+        )
+
+
+def classes_command(args: argparse.Namespace) -> None:
+    names = args.classes or list(STARTING_CLASSES)
+    domain = range(0, args.levels)
+    stats = BatchStats()
+    results = find_levels_bases(
+        load_weapons(args),
+        domain,
+        {name: STARTING_CLASSES[name] for name in names},
+        args.backend,
+        stats,
+    )
+    print(
+        f"Optimized {stats.evaluated} of {stats.requested} requested "
+        f"(class, infusion, level) combinations"
+    )
+    for name, levels in results.items():
+        render(domain, levels, IMAGES / "classes" / name)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="dark_souls")
+    parser.set_defaults(
+        func=plot_command,
+        levels=20,
+        store=True,
+        store_size=None,
+        backend=None,
+        checkpoint=None,
+        types=None,
+        names=None,
+        only=None,
+    )
+    subparsers = parser.add_subparsers()
+
+    plot_parser = subparsers.add_parser("plot", help="plot AR by level increase")
+    plot_parser.add_argument("--levels", type=int, default=20)
+    plot_parser.add_argument("--backend", choices=backend_names())
+    plot_parser.add_argument(
+        "--checkpoint",
+        type=pathlib.Path,
+        help="append finished chunks here and resume from them on restart",
+    )
+    plot_parser.add_argument("--chunk-size", type=int, default=5)
+    add_store_arguments(plot_parser)
+    add_filter_arguments(plot_parser)
+    plot_parser.set_defaults(func=plot_command)
+
+    groups_parser = subparsers.add_parser(
+        "groups", help="plot AR ranges per weapon type without keeping every result"
+    )
+    groups_parser.add_argument("--levels", type=int, default=20)
+    groups_parser.add_argument("--backend", choices=backend_names())
+    groups_parser.add_argument(
+        "--export", type=pathlib.Path, help="also write the ranges as JSON"
+    )
+    add_filter_arguments(groups_parser)
+    add_store_arguments(groups_parser)
+    groups_parser.set_defaults(func=groups_command)
+
+    diff_parser = subparsers.add_parser(
+        "diff", help="recompute only what changed between two catalogues"
+    )
+    diff_parser.add_argument("old", type=pathlib.Path)
+    diff_parser.add_argument("new", type=pathlib.Path)
+    diff_parser.add_argument("--levels", type=int, default=20)
+    diff_parser.add_argument(
+        "--results", type=pathlib.Path, help="previous results to update"
+    )
+    diff_parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        help="where to write the updated results, requires --results",
+    )
+    diff_parser.set_defaults(func=diff_command)
+
+    bench_parser = subparsers.add_parser(
+        "bench", help="time the optimizer backends against each other"
+    )
+    bench_parser.add_argument("--points", type=int, nargs="+", default=[50, 70, 100])
+    bench_parser.add_argument("--infusions", type=int, default=20)
+    bench_parser.add_argument(
+        "--backends", nargs="+", choices=backend_names(), default=None
+    )
+    add_filter_arguments(bench_parser)
+    bench_parser.set_defaults(func=bench_command)
+
+    target_parser = subparsers.add_parser(
+        "target", help="find the fewest levels needed to reach an AR"
+    )
+    target_parser.add_argument("ar", type=int)
+    target_parser.add_argument(
+        "--base",
+        type=int,
+        nargs=5,
+        default=BASE_LEVELS,
+        metavar=("STR", "DEX", "INT", "FAITH", "LUCK"),
+    )
+    target_parser.add_argument("--top", type=int, default=20)
+    target_parser.add_argument("--backend", choices=backend_names())
+    add_filter_arguments(target_parser)
+    target_parser.set_defaults(func=target_command)
+
+    shard_parser = subparsers.add_parser(
+        "shard", help="compute one shard of the catalogue into a shared directory"
+    )
+    shard_parser.add_argument("shard", type=parse_shard, metavar="INDEX/COUNT")
+    shard_parser.add_argument("--chunk-size", type=int, default=5)
+    shard_parser.add_argument("--backend", choices=backend_names())
+    add_sweep_arguments(shard_parser)
+    shard_parser.set_defaults(func=shard_command)
+
+    work_parser = subparsers.add_parser(
+        "work", help="claim and compute unfinished shards until none are left"
+    )
+    work_parser.add_argument("count", type=int)
+    work_parser.add_argument("--chunk-size", type=int, default=5)
+    work_parser.add_argument("--backend", choices=backend_names())
+    work_parser.add_argument(
+        "--stale", type=float, help="reclaim shards locked longer than this (s)"
+    )
+    add_sweep_arguments(work_parser)
+    work_parser.set_defaults(func=work_command)
+
+    merge_parser = subparsers.add_parser(
+        "merge", help="combine finished shards and plot them"
+    )
+    merge_parser.add_argument("count", type=int)
+    merge_parser.add_argument("--output", type=pathlib.Path)
+    add_sweep_arguments(merge_parser)
+    merge_parser.set_defaults(func=merge_command)
+
+    store_parser = subparsers.add_parser(
+        "store", help="inspect, prune or clear the stored results"
+    )
+    store_parser.add_argument(
+        "action", choices=["info", "prune", "clear"], nargs="?", default="info"
+    )
+    store_parser.add_argument(
+        "--store-size", type=int, help="evict stored results beyond this many MiB"
+    )
+    store_parser.set_defaults(func=store_command)
+
+    advise_parser = subparsers.add_parser(
+        "advise", help="rank where the next level is worth the most AR"
+    )
+    advise_parser.add_argument(
+        "stats",
+        type=stat_level,
+        nargs=5,
+        metavar=("STR", "DEX", "INT", "FAITH", "LUCK"),
+    )
+    advise_parser.add_argument("--top", type=int, default=20)
+    add_filter_arguments(advise_parser)
+    advise_parser.set_defaults(func=advise_command)
+
+    classes_parser = subparsers.add_parser(
+        "classes", help="plot AR by level increase for each starting class"
+    )
+    classes_parser.add_argument(
+        "--class",
+        dest="classes",
+        action="append",
+        choices=list(STARTING_CLASSES),
+        help="only plot this class, defaults to all of them",
+    )
+    classes_parser.add_argument("--levels", type=int, default=20)
+    classes_parser.add_argument("--backend", choices=backend_names())
+    add_filter_arguments(classes_parser)
+    classes_parser.set_defaults(func=classes_command)
+
+    args = parser.parse_args(argv)
+    if args.func is diff_command and args.output is not None and args.results is None:
+        # Without previous results only the recomputed subset is known.
+        diff_parser.error("--output requires --results")
+    args.func(args)
 
 
 if __name__ == "__main__":
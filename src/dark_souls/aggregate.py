@@ -0,0 +1,80 @@
+import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .weapons import AR, Infusion, Levels, Weapon, WeaponType
+
+WeaponsRange = Dict[str, List[Tuple[AR, AR]]]
+
+MISSING = -1
+
+
+class GroupAggregator:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._rows: Dict[str, Dict[str, int]] = {}
+        self._maxima = array.array("q")
+        self._minima = array.array("q")
+
+    def _row(self, weapon_type: str, weapon: str) -> int:
+        weapons = self._rows.setdefault(weapon_type, {})
+        row = weapons.get(weapon)
+        if row is None:
+            row = weapons[weapon] = len(self._maxima)
+            self._maxima.extend([MISSING] * self.size)
+            self._minima.extend([MISSING] * self.size)
+        return row
+
+    def add(
+        self, weapon_type: str, weapon: str, ars: Sequence[AR], start: int = 0
+    ) -> None:
+        row = self._row(weapon_type, weapon) + start
+        maxima = self._maxima
+        minima = self._minima
+        for i, ar in enumerate(ars, row):
+            if ar is None:
+                continue
+            if maxima[i] == MISSING or ar > maxima[i]:
+                maxima[i] = ar
+            if minima[i] == MISSING or ar < minima[i]:
+                minima[i] = ar
+
+    def reserve(self, weapons: Iterable[Weapon]) -> "GroupAggregator":
+        # Results arrive grouped by fingerprint, so lay the rows out in
+        # catalogue order first to match the colours and legends of plot.
+        for weapon in weapons:
+            if any(infusion is not None for infusion in weapon.infusions):
+                self._row(weapon.type.name, weapon.name)
+        return self
+
+    def consume(
+        self, results: Iterable[Tuple[Infusion, Sequence[AR]]]
+    ) -> "GroupAggregator":
+        for infusion, ars in results:
+            self.add(infusion.weapon.type.name, infusion.weapon.name, ars)
+        return self
+
+    @classmethod
+    def from_levels(cls, levels: Levels) -> "GroupAggregator":
+        aggregator = None
+        for weapon_type, weapons in levels.items():
+            for weapon, infusions in weapons.items():
+                for ars in infusions.values():
+                    if aggregator is None:
+                        aggregator = cls(len(ars))
+                    aggregator.add(weapon_type, weapon, ars)
+        return cls(0) if aggregator is None else aggregator
+
+    @staticmethod
+    def _value(values: array.array, i: int) -> Optional[int]:
+        value = values[i]
+        return None if value == MISSING else value
+
+    def groups(self) -> Iterator[Tuple[str, WeaponsRange]]:
+        for weapon_type, weapons in self._rows.items():
+            yield WeaponType[weapon_type].value, {
+                weapon: [
+                    (self._value(self._maxima, i), self._value(self._minima, i))
+                    for i in range(row, row + self.size)
+                ]
+                for weapon, row in weapons.items()
+            }
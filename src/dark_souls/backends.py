@@ -0,0 +1,215 @@
+import dataclasses
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .weapons import Infusion
+
+try:
+    import numba
+    import numpy
+except ImportError:
+    numba = None
+    numpy = None
+
+Ties = List[Tuple[Tuple[int, int, int, int, int], List[int]]]
+Backend = Callable[[Infusion, Sequence[int], int], Ties]
+
+BACKENDS: Dict[str, Backend] = {}
+
+# The order each damage type adds its stats in ``Infusion.damages``.
+# Kernels must add in the same order to truncate to the same ints.
+ORDERS = (
+    (0, 1, 4, 3),
+    (2, 3, -1, -1),
+    (2, 3, -1, -1),
+    (3, -1, -1, -1),
+    (2, 3, -1, -1),
+)
+
+
+def register(name: str) -> Callable[[Backend], Backend]:
+    def inner(backend: Backend) -> Backend:
+        BACKENDS[name] = backend
+        return backend
+
+    return inner
+
+
+def get_backend(name: Optional[str] = None) -> Backend:
+    if name is None:
+        name = "search"
+    if name == "numba" and name not in BACKENDS:
+        name = "python"
+    return BACKENDS[name]
+
+
+def backend_names() -> List[str]:
+    # "numba" is always accepted so the python fallback is reachable.
+    return sorted(set(BACKENDS) | {"numba"})
+
+
+@dataclasses.dataclass
+class KernelArgs:
+    damage: List[float]
+    coefficients: List[List[float]]
+    curves: List[List[float]]
+    start: List[int]
+    links: List[int]
+    caps: List[int]
+    points: int
+
+    @classmethod
+    def from_infusion(
+        cls, infusion: Infusion, levels: Sequence[int], points: int
+    ) -> Optional["KernelArgs"]:
+        links, start, points = infusion._start(levels, points)
+        if points < 0 or not links or any(i > 99 for i in start):
+            return None
+        return cls(
+            damage=list(dataclasses.astuple(infusion.damage)),
+            coefficients=[list(row) for row in infusion.coefficients],
+            curves=[
+                infusion.saturation.physical,
+                infusion.saturation.magic,
+                infusion.saturation.fire,
+                infusion.saturation.lightning,
+                infusion.saturation.dark,
+            ],
+            start=start,
+            links=links,
+            caps=[99 - start[i] for i in links],
+            points=points,
+        )
+
+
+def max_level_kernel(damage, coefficients, orders, curves, start, links, caps, points):
+    k = len(links)
+    level = start.copy()
+    allocation = [0 for _ in range(k)]
+    best = -1
+    ties = [0 for _ in range(0)]
+    used = 0
+    while True:
+        rest = points - used
+        if rest <= caps[k - 1]:
+            allocation[k - 1] = rest
+            for j in range(k):
+                level[links[j]] = start[links[j]] + allocation[j]
+            ar = 0
+            for t in range(5):
+                if damage[t] == 0:
+                    continue
+                total = 1.0
+                for o in range(4):
+                    s = orders[t][o]
+                    if s < 0:
+                        break
+                    total += coefficients[t][s] * curves[t][level[s]]
+                ar += int(damage[t] * total)
+            if ar > best:
+                best = ar
+                ties = [0 for _ in range(0)]
+            if ar == best:
+                for j in range(k):
+                    ties.append(allocation[j])
+        j = k - 2
+        while j >= 0:
+            if allocation[j] < caps[j] and used < points:
+                allocation[j] += 1
+                used += 1
+                break
+            used -= allocation[j]
+            allocation[j] = 0
+            j -= 1
+        if j < 0:
+            break
+    return best, ties
+
+
+def _ties(infusion: Infusion, args: KernelArgs, flat: Sequence[int]) -> Ties:
+    k = len(args.links)
+    output = []
+    for index in range(0, len(flat), k):
+        level = list(args.start)
+        for i, value in zip(args.links, flat[index : index + k]):
+            level[i] += int(value)
+        output.append((infusion.damages(*level), level))
+    return output
+
+
+@register("enumerate")
+def enumerate_backend(infusion: Infusion, levels: Sequence[int], points: int) -> Ties:
+    return list(infusion._max_level(levels, points))
+
+
+@register("search")
+def search_backend(infusion: Infusion, levels: Sequence[int], points: int) -> Ties:
+    return list(infusion.max_level(levels, points))
+
+
+@register("python")
+def python_backend(infusion: Infusion, levels: Sequence[int], points: int) -> Ties:
+    args = KernelArgs.from_infusion(infusion, levels, points)
+    if args is None:
+        return enumerate_backend(infusion, levels, points)
+    _, flat = max_level_kernel(
+        args.damage,
+        args.coefficients,
+        ORDERS,
+        args.curves,
+        args.start,
+        args.links,
+        args.caps,
+        args.points,
+    )
+    return _ties(infusion, args, flat)
+
+
+if numba is not None:
+    _numba_kernel = numba.njit(cache=True)(max_level_kernel)
+    _ORDERS = numpy.array(ORDERS, dtype=numpy.int64)
+
+    @register("numba")
+    def numba_backend(infusion: Infusion, levels: Sequence[int], points: int) -> Ties:
+        args = KernelArgs.from_infusion(infusion, levels, points)
+        if args is None:
+            return enumerate_backend(infusion, levels, points)
+        _, flat = _numba_kernel(
+            numpy.array(args.damage, dtype=numpy.float64),
+            numpy.array(args.coefficients, dtype=numpy.float64),
+            _ORDERS,
+            numpy.array(args.curves, dtype=numpy.float64),
+            numpy.array(args.start, dtype=numpy.int64),
+            numpy.array(args.links, dtype=numpy.int64),
+            numpy.array(args.caps, dtype=numpy.int64),
+            args.points,
+        )
+        return _ties(infusion, args, flat)
+
+
+def benchmark(
+    infusions: Sequence[Infusion],
+    levels: Sequence[int],
+    points: Sequence[int],
+    names: Optional[Sequence[str]] = None,
+) -> Dict[int, Dict[str, float]]:
+    if not points:
+        return {}
+    if names is None:
+        names = list(BACKENDS)
+    backends = {name: get_backend(name) for name in names}
+    # Warm up untimed at a budget that reaches the kernels, so the first
+    # timing doesn't include JIT compilation or cache loading. At 0 points
+    # the requirements can't be met and every backend falls back early.
+    for backend in backends.values():
+        for infusion in infusions:
+            backend(infusion, levels, points[0])
+    timings = {}
+    for p in points:
+        timings[p] = {}
+        for name, backend in backends.items():
+            start = time.perf_counter()
+            for infusion in infusions:
+                backend(infusion, levels, p)
+            timings[p][name] = time.perf_counter() - start
+    return timings
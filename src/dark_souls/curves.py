@@ -0,0 +1,186 @@
+import dataclasses
+import heapq
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+EPSILON = 1e-9
+TOLERANCE = 1e-6
+NEG_INF = float("-inf")
+
+Allocation = Tuple[int, ...]
+
+
+def marginal_gains(curve: Sequence[float]) -> List[float]:
+    return [b - a for a, b in zip(curve, curve[1:])]
+
+
+def breakpoints(curve: Sequence[float], epsilon: float = EPSILON) -> List[int]:
+    gains = marginal_gains(curve)
+    return [i for i in range(1, len(gains)) if abs(gains[i] - gains[i - 1]) > epsilon]
+
+
+def is_concave(
+    gains: Sequence[float],
+    start: int = 0,
+    stop: Optional[int] = None,
+    epsilon: float = EPSILON,
+) -> bool:
+    gains = gains[start:stop]
+    return all(b <= a + epsilon for a, b in zip(gains, gains[1:]))
+
+
+def concave_from(gains: Sequence[float], epsilon: float = EPSILON) -> int:
+    start = max(len(gains) - 1, 0)
+    while start > 0 and gains[start] <= gains[start - 1] + epsilon:
+        start -= 1
+    return start
+
+
+@dataclasses.dataclass
+class CurveAnalysis:
+    id: str
+    gains: List[float]
+    breakpoints: List[int]
+    concave_from: int
+
+    @property
+    def concave(self) -> bool:
+        return self.concave_from == 0
+
+    @classmethod
+    def from_curve(cls, id: str, curve: Sequence[float]) -> "CurveAnalysis":
+        gains = marginal_gains(curve)
+        return cls(
+            id=id,
+            gains=gains,
+            breakpoints=breakpoints(curve),
+            concave_from=concave_from(gains),
+        )
+
+
+def analyse_curves(curves: Dict[str, Sequence[float]]) -> Dict[str, CurveAnalysis]:
+    return {k: CurveAnalysis.from_curve(k, v) for k, v in curves.items()}
+
+
+def max_plus(
+    a: Sequence[float], b: Sequence[float], limit: Optional[int] = None
+) -> List[float]:
+    size = len(a) + len(b) - 1
+    if limit is not None:
+        size = min(size, limit + 1)
+    gains_a = marginal_gains(a)
+    gains_b = marginal_gains(b)
+    if is_concave(gains_a) and is_concave(gains_b):
+        output = [a[0] + b[0]]
+        for gain in heapq.merge(gains_a, gains_b, key=lambda g: -g):
+            if len(output) == size:
+                break
+            output.append(output[-1] + gain)
+        return output
+    output = [NEG_INF] * size
+    for i, x in enumerate(a[:size]):
+        for j, y in enumerate(b[: size - i]):
+            if x + y > output[i + j]:
+                output[i + j] = x + y
+    return output
+
+
+def suffix_maxima(tables: Sequence[Sequence[float]], limit: int) -> List[List[float]]:
+    suffixes = [[0.0]]
+    for table in reversed(tables):
+        suffixes.append(max_plus(table, suffixes[-1], limit))
+    suffixes.reverse()
+    return suffixes
+
+
+def _best_allocation(
+    tables: Sequence[Sequence[float]], suffixes: List[List[float]], points: int
+) -> Allocation:
+    allocation = []
+    for table, rest in zip(tables, suffixes[1:]):
+        _, i = max(
+            (table[i] + rest[points - i], i)
+            for i in range(min(points, len(table) - 1) + 1)
+            if points - i < len(rest)
+        )
+        allocation.append(i)
+        points -= i
+    return tuple(allocation)
+
+
+def _search(
+    tables: Sequence[Sequence[float]],
+    suffixes: List[List[float]],
+    points: int,
+    score: Callable[[Allocation], float],
+    offset: float,
+    tolerance: float,
+    best: List[float],
+) -> Iterator[Tuple[float, Allocation]]:
+    """Yield every allocation whose bound can still reach ``best[0]``."""
+    n = len(tables)
+    allocation = [0] * n
+
+    def visit(k: int, remaining: int, value: float):
+        table = tables[k]
+        rest = suffixes[k + 1]
+        for i in range(
+            max(remaining - len(rest) + 1, 0), min(remaining, len(table) - 1) + 1
+        ):
+            r = remaining - i
+            if offset + value + table[i] + rest[r] < best[0] - tolerance:
+                continue
+            allocation[k] = i
+            if k + 1 < n:
+                yield from visit(k + 1, r, value + table[i])
+            else:
+                candidate = tuple(allocation)
+                yield score(candidate), candidate
+
+    return visit(0, points, 0.0)
+
+
+def bounded_max(
+    tables: Sequence[Sequence[float]],
+    points: int,
+    score: Callable[[Allocation], float],
+    offset: float = 0.0,
+    tolerance: float = TOLERANCE,
+    suffixes: Optional[List[List[float]]] = None,
+) -> Optional[float]:
+    """
+    Find the maximum ``score`` of any allocation of exactly ``points``.
+
+    ``score`` must never exceed ``offset`` plus the sum of ``tables``.
+    """
+    if suffixes is None:
+        suffixes = suffix_maxima(tables, points)
+    if points >= len(suffixes[0]):
+        return None
+    best = [score(_best_allocation(tables, suffixes, points))]
+    for result, _ in _search(tables, suffixes, points, score, offset, tolerance, best):
+        if result > best[0]:
+            best[0] = result
+    return best[0]
+
+
+def bounded_ties(
+    tables: Sequence[Sequence[float]],
+    points: int,
+    score: Callable[[Allocation], float],
+    offset: float = 0.0,
+    tolerance: float = TOLERANCE,
+    best: Optional[float] = None,
+    suffixes: Optional[List[List[float]]] = None,
+) -> Iterator[Allocation]:
+    """Lazily yield every allocation scoring ``best``, in lexicographic order."""
+    if suffixes is None:
+        suffixes = suffix_maxima(tables, points)
+    if best is None:
+        best = bounded_max(tables, points, score, offset, tolerance, suffixes)
+        if best is None:
+            return
+    for result, allocation in _search(
+        tables, suffixes, points, score, offset, tolerance, [best]
+    ):
+        if result == best:
+            yield allocation
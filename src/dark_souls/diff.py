@@ -0,0 +1,124 @@
+import dataclasses
+import json
+import pathlib
+from typing import Dict, Iterator, List, Set, Tuple
+
+from .weapons import AR, Levels
+
+Curves = Dict[str, List[float]]
+Catalogue = Tuple[List[dict], Curves]
+
+
+def load_catalogue(path: pathlib.Path) -> Catalogue:
+    with (path / "weapons.json").open() as f:
+        weapons = json.load(f)
+    with (path / "misc.json").open() as f:
+        curves = json.load(f)
+    return weapons, curves
+
+
+def curve_ids(weapon: dict) -> Set[str]:
+    return {str(v) for v in weapon["stat_funcs"]}
+
+
+@dataclasses.dataclass
+class CatalogueDiff:
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+    curves: List[str]
+    affected: List[str]
+
+    @property
+    def recompute(self) -> List[str]:
+        return self.added + self.affected
+
+    @classmethod
+    def from_catalogues(cls, old: Catalogue, new: Catalogue) -> "CatalogueDiff":
+        old_weapons = {w["id"]: w for w in old[0]}
+        new_weapons = {w["id"]: w for w in new[0]}
+        curves = sorted(
+            k for k in old[1].keys() | new[1].keys() if old[1].get(k) != new[1].get(k)
+        )
+        changed = [
+            k
+            for k, w in new_weapons.items()
+            if k in old_weapons and old_weapons[k] != w
+        ]
+        changed_curves = set(curves)
+        affected = [
+            k
+            for k, w in new_weapons.items()
+            if k in old_weapons and (k in changed or curve_ids(w) & changed_curves)
+        ]
+        return cls(
+            added=[k for k in new_weapons if k not in old_weapons],
+            removed=[k for k in old_weapons if k not in new_weapons],
+            changed=changed,
+            curves=curves,
+            affected=affected,
+        )
+
+
+@dataclasses.dataclass
+class Change:
+    weapon_type: str
+    weapon: str
+    infusion: str
+    old: List[AR]
+    new: List[AR]
+
+    @property
+    def budgets(self) -> List[int]:
+        return [i for i, (o, n) in enumerate(zip(self.old, self.new)) if o != n]
+
+    def __str__(self) -> str:
+        deltas = [(n or 0) - (o or 0) for o, n in zip(self.old, self.new) if o != n]
+        return (
+            f"{self.weapon}[{self.infusion}]: {len(deltas)} budgets changed, "
+            f"AR {min(deltas):+d} to {max(deltas):+d}"
+        )
+
+
+def _flatten(levels: Levels) -> Iterator[Tuple[Tuple[str, str, str], List[AR]]]:
+    for weapon_type, weapons in levels.items():
+        for weapon, infusions in weapons.items():
+            for infusion, ars in infusions.items():
+                yield (weapon_type, weapon, infusion), ars
+
+
+def compare_levels(old: Levels, new: Levels, size: int) -> List[Change]:
+    old_ars = dict(_flatten(old))
+    new_ars = dict(_flatten(new))
+    default = [None] * size
+    return [
+        Change(*key, old_ars.get(key, default), new_ars.get(key, default))
+        for key in sorted(old_ars.keys() | new_ars.keys())
+        if old_ars.get(key, default) != new_ars.get(key, default)
+    ]
+
+
+def update_levels(results: Levels, old: Levels, new: Levels, layout: Levels) -> Levels:
+    for key, _ in _flatten(old):
+        weapon_type, weapon, _ = key
+        results.get(weapon_type, {}).pop(weapon, None)
+    for (weapon_type, weapon, infusion), ars in _flatten(new):
+        results.setdefault(weapon_type, {}).setdefault(weapon, {})[infusion] = ars
+    # Follow the new catalogue's order, as a full sweep would.
+    output: Levels = {}
+    for (weapon_type, weapon, infusion), _ in _flatten(layout):
+        ars = results.get(weapon_type, {}).get(weapon, {}).get(infusion)
+        if ars is not None:
+            output.setdefault(weapon_type, {}).setdefault(weapon, {})[infusion] = ars
+    return output
+
+
+def report(diff: CatalogueDiff, changes: List[Change]) -> str:
+    lines = [
+        f"Curves changed: {', '.join(diff.curves) or '-'}",
+        f"Weapons added: {len(diff.added)}, removed: {len(diff.removed)}, "
+        f"changed: {len(diff.changed)}, affected: {len(diff.affected)}",
+        f"AR curves changed: {len(changes)}",
+    ]
+    lines.extend(f"  {change}" for change in changes)
+    return "\n".join(lines)
@@ -0,0 +1,61 @@
+import dataclasses
+from typing import Iterable, List, Optional, Sequence
+
+from .backends import Backend, Ties, get_backend
+from .weapons import Infusion, Weapon, group_infusions
+
+
+@dataclasses.dataclass
+class MinimumPoints:
+    points: int
+    ar: int
+    infusion: Infusion
+    ties: Ties
+
+
+def points_limit(infusion: Infusion, levels: Sequence[int]) -> int:
+    links, start, remaining = infusion._start(levels, 0)
+    return sum(99 - start[i] for i in links) - remaining
+
+
+def min_points(
+    infusion: Infusion,
+    levels: Sequence[int],
+    target: int,
+    backend: Optional[Backend] = None,
+) -> Optional[MinimumPoints]:
+    if backend is None:
+        backend = get_backend()
+
+    def evaluate(points):
+        ties = backend(infusion, levels, points)
+        return (sum(ties[0][0]) if ties else 0), ties
+
+    low, high = 0, points_limit(infusion, levels)
+    ar, ties = evaluate(high)
+    if ar < target:
+        return None
+    while low < high:
+        middle = (low + high) // 2
+        middle_ar, middle_ties = evaluate(middle)
+        if middle_ar >= target:
+            high, ar, ties = middle, middle_ar, middle_ties
+        else:
+            low = middle + 1
+    return MinimumPoints(high, ar, infusion, ties)
+
+
+def rank_min_points(
+    weapons: Iterable[Weapon],
+    levels: Sequence[int],
+    target: int,
+    backend: Optional[Backend] = None,
+) -> List[MinimumPoints]:
+    results = []
+    for members in group_infusions(weapons).values():
+        result = min_points(members[0], levels, target, backend)
+        if result is None:
+            continue
+        for infusion in members:
+            results.append(dataclasses.replace(result, infusion=infusion))
+    return sorted(results, key=lambda r: (r.points, -r.ar))
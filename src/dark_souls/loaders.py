@@ -1,10 +1,15 @@
+import asyncio
+import functools
 import itertools
 import json
 import pathlib
 from typing import (
     Any,
+    AsyncIterator,
     Callable,
+    Collection,
     Dict,
+    Iterable,
     Iterator,
     List,
     NoReturn,
@@ -72,27 +77,33 @@ class Cache:
 
 
 class Web:
+    WEAPONS_URL = "https://mugenmonkey.com/api/v0/ds3_weapons"
+    MISC_DATA_URL = "https://mugenmonkey.com/api/v0/misc_data"
+    PER_PAGE_LIMIT = 500
+
     @staticmethod
+    def _get(url: str, per_page: int, page: int) -> dict:
+        r = requests.get(url, params={"per_page": per_page, "page": page})
+        return r.json()
+
+    @classmethod
     def _gets(
-        url: str, per_page: int, per_page_limit: int, key: Callable[[dict], int]
+        cls, url: str, per_page: int, per_page_limit: int, key: Callable[[dict], int]
     ) -> Iterator[dict]:
         if per_page > per_page_limit:
-            raise ValueError("`per_page` can be a max of {per_page_limit}")
+            raise ValueError(f"`per_page` can be a max of {per_page_limit}")
         for page in itertools.count(0):
-            r = requests.get(url, params={"per_page": per_page, "page": page})
-            data = r.json()
+            data = cls._get(url, per_page, page)
             yield data
             if key(data) < per_page:
                 break
 
-    @classmethod
-    def load_weapons(cls, per_page: int = 500) -> List[dict]:
-        results = cls._gets(
-            "https://mugenmonkey.com/api/v0/ds3_weapons",
-            per_page,
-            500,
-            lambda d: len(d["results"]),
-        )
+    @staticmethod
+    def _weapons_size(data: dict) -> int:
+        return len(data["results"])
+
+    @staticmethod
+    def _parse_weapons(results: Iterable[dict]) -> List[dict]:
         weapons = []
         for result in results:
             for r in result["results"]:
@@ -106,20 +117,104 @@ class Web:
                 weapons.append(w)
         return weapons
 
-    @classmethod
-    def load_misc_data(cls, per_page: int = 500) -> Dict[Any, List[Union[int, float]]]:
-        results = cls._gets(
-            "https://mugenmonkey.com/api/v0/misc_data",
-            per_page,
-            500,
-            lambda d: len(d["dark_souls_3"]["scaling_saturation_curves"]),
-        )
+    @staticmethod
+    def _misc_data_size(data: dict) -> int:
+        return len(data["dark_souls_3"]["scaling_saturation_curves"])
+
+    @staticmethod
+    def _parse_misc_data(
+        results: Iterable[dict],
+    ) -> Dict[Any, List[Union[int, float]]]:
         misc_data = {}
         for result in results:
             for k, v in result["dark_souls_3"]["scaling_saturation_curves"].items():
                 misc_data[k] = [i / 100 for i in v]
         return misc_data
 
+    @classmethod
+    def load_weapons(cls, per_page: int = 500) -> List[dict]:
+        return cls._parse_weapons(
+            cls._gets(cls.WEAPONS_URL, per_page, cls.PER_PAGE_LIMIT, cls._weapons_size)
+        )
+
+    @classmethod
+    def load_misc_data(cls, per_page: int = 500) -> Dict[Any, List[Union[int, float]]]:
+        return cls._parse_misc_data(
+            cls._gets(
+                cls.MISC_DATA_URL, per_page, cls.PER_PAGE_LIMIT, cls._misc_data_size
+            )
+        )
+
+
+class AsyncWeb:
+    @staticmethod
+    async def _gets(
+        url: str,
+        per_page: int,
+        per_page_limit: int,
+        key: Callable[[dict], int],
+        concurrency: int,
+    ) -> List[dict]:
+        if per_page > per_page_limit:
+            raise ValueError(f"`per_page` can be a max of {per_page_limit}")
+        if concurrency < 1:
+            raise ValueError("`concurrency` must be at least 1")
+        loop = asyncio.get_running_loop()
+
+        def get(page):
+            return loop.run_in_executor(None, Web._get, url, per_page, page)
+
+        pages = {0: await get(0)}
+        last = 0 if key(pages[0]) < per_page else None
+        pending = {}
+        next_page = 1
+        try:
+            while last is None or pending:
+                while last is None and len(pending) < concurrency:
+                    pending[get(next_page)] = next_page
+                    next_page += 1
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    page = pending.pop(future)
+                    pages[page] = future.result()
+                    if key(pages[page]) < per_page and (last is None or page < last):
+                        last = page
+        finally:
+            # Executor threads can't be cancelled once running, so wait for
+            # the pages still in flight and drop their results or errors.
+            await asyncio.gather(*pending, return_exceptions=True)
+        return [pages[page] for page in range(last + 1)]
+
+    @classmethod
+    async def load_weapons(
+        cls, per_page: int = 500, concurrency: int = 4
+    ) -> List[dict]:
+        return Web._parse_weapons(
+            await cls._gets(
+                Web.WEAPONS_URL,
+                per_page,
+                Web.PER_PAGE_LIMIT,
+                Web._weapons_size,
+                concurrency,
+            )
+        )
+
+    @classmethod
+    async def load_misc_data(
+        cls, per_page: int = 500, concurrency: int = 4
+    ) -> Dict[Any, List[Union[int, float]]]:
+        return Web._parse_misc_data(
+            await cls._gets(
+                Web.MISC_DATA_URL,
+                per_page,
+                Web.PER_PAGE_LIMIT,
+                Web._misc_data_size,
+                concurrency,
+            )
+        )
+
 
 def grouper(it: Iterator[T], n: int) -> Iterator[Tuple[T]]:
     return zip(*[iter(it)] * n)
@@ -143,7 +238,9 @@ class Loader:
         return data
 
     @classmethod
-    def _load_infusions(cls, curves, w, weapon) -> Iterator[Optional[Infusion]]:
+    def _load_infusions(
+        cls, curves, w, weapon, saturations, only
+    ) -> Iterator[Optional[Infusion]]:
         for inf, d, s, s_, c in zip(
             [i for i in WeaponInfusion],
             grouper(weapon["base_damage"], 5),
@@ -151,20 +248,84 @@ class Loader:
             weapon["scaling_coefficients"][-16:],
             grouper(weapon["stat_funcs"], 5),
         ):
+            if only is not None and inf not in only:
+                yield None
+                continue
             c = [int(v) for v in c]
             d = [float(v) for v in d]
             s = [float(v) / 100 for v in s] + [float(s_) / 100]
             if any(c) or any(d) or any(s):
+                key = tuple(c)
+                if key not in saturations:
+                    saturations[key] = SaturationCurve(*[curves[str(v)] for v in c])
                 yield Infusion(
                     weapon=w,
                     infusion=inf,
                     scaling=ScalingCoefficients(*s),
                     damage=Damage(*d),
-                    saturation=SaturationCurve(*[curves[str(v)] for v in c]),
+                    saturation=saturations[key],
                 )
             else:
                 yield None
 
+    @classmethod
+    def _build_infusions(cls, curves, weapon, saturations, only, w) -> Infusions:
+        infusions = list(cls._load_infusions(curves, w, weapon, saturations, only))
+        if not infusions:
+            infusions = [None] * 16
+        return Infusions(*infusions)
+
+    @classmethod
+    def _load_weapon(cls, curves, weapon, saturations, only=None) -> Weapon:
+        w = Weapon(
+            name=weapon["name"],
+            id=weapon["id"],
+            type=enum_by_value(WeaponType)[weapon["weapon_type"]],
+            weight=float(weapon["weight"]),
+            bleed=float(weapon["bleed"]),
+            poison=float(weapon["poison"]),
+            frost=float(weapon["frost"]),
+            requirements=Requirements(
+                str=int(weapon["strength_req"]),
+                dex=int(weapon["dex_req"]),
+                int=int(weapon["intelligence_req"]),
+                faith=int(weapon["faith_req"]),
+            ),
+            defence=Damage(
+                physical=float(weapon["physical_def"]),
+                magic=float(weapon["magic_def"]),
+                fire=float(weapon["fire_def"]),
+                lightning=float(weapon["lightning_def"]),
+                dark=float(weapon["dark_def"]),
+            ),
+            infusable=bool(weapon["infusable"]),
+            dual_wield=bool(weapon["dual_wield"]),
+        )
+        w.source = functools.partial(
+            cls._build_infusions, curves, weapon, saturations, only
+        )
+        return w
+
+    @classmethod
+    def from_data(
+        cls,
+        weapons: Iterable[dict],
+        curves: Dict[str, List[float]],
+        *,
+        types: Optional[Collection[WeaponType]] = None,
+        names: Optional[Collection[str]] = None,
+        infusions: Optional[Collection[WeaponInfusion]] = None,
+    ) -> Iterator[Weapon]:
+        type_values = None if types is None else {t.value for t in types}
+        only = None if infusions is None else set(infusions)
+        saturations = {}
+        for weapon in weapons:
+            if type_values is not None and weapon["weapon_type"] not in type_values:
+                continue
+            if names is not None and weapon["name"] not in names:
+                continue
+            yield cls._load_weapon(curves, weapon, saturations, only)
+
     @classmethod
     def load_weapons(
         cls,
@@ -172,48 +333,73 @@ class Loader:
         cache: bool = True,
         force: bool = False,
         misc_cache: bool = True,
-        misc_force: bool = False
+        misc_force: bool = False,
+        types: Optional[Collection[WeaponType]] = None,
+        names: Optional[Collection[str]] = None,
+        infusions: Optional[Collection[WeaponInfusion]] = None,
     ) -> Iterator[Weapon]:
         weapons = cls._load(
             Cache.load_weapons, Cache.save_weapons, Web.load_weapons, cache, force
         )
-        ts = set()
         curves = cls.load_misc_data(cache=misc_cache, force=misc_force)
-        for weapon in weapons:
-            ts.add(weapon["weapon_type"])
-            w = Weapon(
-                name=weapon["name"],
-                id=weapon["id"],
-                type=enum_by_value(WeaponType)[weapon["weapon_type"]],
-                weight=float(weapon["weight"]),
-                bleed=float(weapon["bleed"]),
-                poison=float(weapon["poison"]),
-                frost=float(weapon["frost"]),
-                requirements=Requirements(
-                    str=int(weapon["strength_req"]),
-                    dex=int(weapon["dex_req"]),
-                    int=int(weapon["intelligence_req"]),
-                    faith=int(weapon["faith_req"]),
-                ),
-                defence=Damage(
-                    physical=float(weapon["physical_def"]),
-                    magic=float(weapon["magic_def"]),
-                    fire=float(weapon["fire_def"]),
-                    lightning=float(weapon["lightning_def"]),
-                    dark=float(weapon["dark_def"]),
-                ),
-                infusable=bool(weapon["infusable"]),
-                dual_wield=bool(weapon["dual_wield"]),
-                infusions=...,
-            )
-            infusions = list(cls._load_infusions(curves, w, weapon))
-            if not infusions:
-                infusions = [None] * 16
-            w.infusions = Infusions(*infusions)
-            yield w
+        yield from cls.from_data(
+            weapons, curves, types=types, names=names, infusions=infusions
+        )
 
     @classmethod
     def load_misc_data(cls, *, cache: bool = True, force: bool = False):
         return cls._load(
             Cache.load_misc_data, Cache.save_misc_data, Web.load_misc_data, cache, force
         )
+
+
+class AsyncLoader:
+    @staticmethod
+    async def _load(load_cache, save_cache, load_web, cache, force):
+        loop = asyncio.get_running_loop()
+        if not force:
+            try:
+                return await loop.run_in_executor(None, load_cache)
+            except FileNotFoundError:
+                pass
+        data = await load_web()
+        if cache:
+            await loop.run_in_executor(None, save_cache, data)
+        return data
+
+    @classmethod
+    async def load_weapons(
+        cls,
+        *,
+        cache: bool = True,
+        force: bool = False,
+        misc_cache: bool = True,
+        misc_force: bool = False,
+        types: Optional[Collection[WeaponType]] = None,
+        names: Optional[Collection[str]] = None,
+        infusions: Optional[Collection[WeaponInfusion]] = None,
+    ) -> AsyncIterator[Weapon]:
+        weapons, curves = await asyncio.gather(
+            cls._load(
+                Cache.load_weapons,
+                Cache.save_weapons,
+                AsyncWeb.load_weapons,
+                cache,
+                force,
+            ),
+            cls.load_misc_data(cache=misc_cache, force=misc_force),
+        )
+        for weapon in Loader.from_data(
+            weapons, curves, types=types, names=names, infusions=infusions
+        ):
+            yield weapon
+
+    @classmethod
+    async def load_misc_data(cls, *, cache: bool = True, force: bool = False):
+        return await cls._load(
+            Cache.load_misc_data,
+            Cache.save_misc_data,
+            AsyncWeb.load_misc_data,
+            cache,
+            force,
+        )
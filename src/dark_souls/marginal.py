@@ -0,0 +1,59 @@
+import dataclasses
+from typing import Iterable, List, Sequence, Tuple
+
+from .weapons import Infusion, Weapon, group_infusions
+
+STATS = ("str", "dex", "int", "faith", "luck")
+
+
+@dataclasses.dataclass
+class MarginalValue:
+    infusion: Infusion
+    ar: int
+    gains: Tuple[int, int, int, int, int]
+    scaling: Tuple[float, float, float, float, float]
+
+    @property
+    def best(self) -> int:
+        return max(range(5), key=lambda i: (self.gains[i], self.scaling[i]))
+
+    @property
+    def key(self) -> Tuple[int, float]:
+        return self.gains[self.best], self.scaling[self.best]
+
+
+def check_levels(levels: Sequence[int]) -> None:
+    if len(levels) != len(STATS):
+        raise ValueError(f"expected {len(STATS)} stats, got {len(levels)}")
+    for stat, level in zip(STATS, levels):
+        if not 1 <= level <= 99:
+            raise ValueError(f"{stat} must be between 1 and 99, got {level}")
+
+
+def marginal_value(infusion: Infusion, levels: Sequence[int]) -> MarginalValue:
+    check_levels(levels)
+    ar = sum(infusion.damages(*levels))
+    tables = infusion.stat_tables
+    gains = []
+    scaling = []
+    for stat, level in enumerate(levels):
+        if level >= 99:
+            gains.append(0)
+            scaling.append(0.0)
+            continue
+        next_levels = list(levels)
+        next_levels[stat] += 1
+        gains.append(sum(infusion.damages(*next_levels)) - ar)
+        scaling.append(tables[stat][level + 1] - tables[stat][level])
+    return MarginalValue(infusion, ar, tuple(gains), tuple(scaling))
+
+
+def marginal_values(
+    weapons: Iterable[Weapon], levels: Sequence[int]
+) -> List[MarginalValue]:
+    check_levels(levels)
+    values = []
+    for members in group_infusions(weapons).values():
+        value = marginal_value(members[0], levels)
+        values.extend(dataclasses.replace(value, infusion=i) for i in members)
+    return sorted(values, key=lambda v: v.key, reverse=True)
@@ -1,3 +1,6 @@
+from .ties import Ties, TiesUnion
+
+
 def max_product(list_a, list_b):
     output = {}
     for i, a in enumerate(list_a):
@@ -30,5 +33,8 @@ def max_level(n, curves):
 
 def max_levels(levels, curves):
     for n in range(levels + 1):
-        total, a, bc, de = max(max_level(n, curves), key=lambda i: i[0])
-        yield total, [(a, b, c, d, e) for b, c in bc for d, e in de]
+        splits = list(max_level(n, curves))
+        total = max(split[0] for split in splits)
+        yield total, TiesUnion(
+            Ties([[(a,)], bc, de]) for value, a, bc, de in splits if value == total
+        )
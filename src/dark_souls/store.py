@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import pathlib
+from typing import List, Optional, Sequence, Tuple
+
+from .weapons import AR, Infusion
+
+# Bump when a change alters the ARs computed for the same inputs.
+VERSION = 1
+
+
+class ResultStore:
+    PATH = pathlib.Path("./.darksouls/results")
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(
+        self, path: Optional[pathlib.Path] = None, max_bytes: Optional[int] = None
+    ) -> None:
+        self.path = self.PATH if path is None else path
+        self.max_bytes = self.MAX_BYTES if max_bytes is None else max_bytes
+
+    @staticmethod
+    def key(infusion: Infusion, budgets: Sequence[int], levels: Sequence[int]) -> str:
+        data = json.dumps([VERSION, infusion.fingerprint, list(budgets), list(levels)])
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.path / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[List[AR]]:
+        path = self._path(key)
+        try:
+            with path.open() as f:
+                ars = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(path)
+        return ars
+
+    def put(self, key: str, ars: List[AR]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}")
+        with tmp.open("w") as f:
+            json.dump(ars, f)
+        os.replace(tmp, path)
+
+    def entries(self) -> List[Tuple[pathlib.Path, os.stat_result]]:
+        if not self.path.exists():
+            return []
+        return [(path, path.stat()) for path in self.path.glob("*/*.json")]
+
+    def info(self) -> Tuple[int, int]:
+        entries = self.entries()
+        return len(entries), sum(stat.st_size for _, stat in entries)
+
+    def prune(self) -> int:
+        entries = sorted(self.entries(), key=lambda e: e[1].st_mtime, reverse=True)
+        total = 0
+        removed = 0
+        for path, stat in entries:
+            total += stat.st_size
+            if total > self.max_bytes:
+                path.unlink()
+                removed += 1
+        return removed
+
+    def clear(self) -> int:
+        entries = self.entries()
+        for path, _ in entries:
+            path.unlink()
+        return len(entries)
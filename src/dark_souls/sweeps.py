@@ -0,0 +1,382 @@
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import pathlib
+import socket
+import time
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .backends import Backend, get_backend
+from .store import ResultStore
+from .weapons import AR, Infusion, Levels, Weapon, group_infusions
+
+ChunkKey = Tuple[str, int, int]
+
+
+def chunk_key(infusion: Infusion, start: int, stop: int) -> ChunkKey:
+    # Key by what the ARs are computed from, so a refreshed catalogue
+    # never reuses chunks of an infusion whose stats have changed.
+    fingerprint = json.dumps(infusion.fingerprint).encode("utf-8")
+    return hashlib.sha256(fingerprint).hexdigest(), start, stop
+
+
+def chunks(size: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    for start in range(0, size, chunk_size):
+        yield start, min(start + chunk_size, size)
+
+
+def infusion_ars(
+    infusion: Infusion, budgets: Sequence[int], levels: Sequence[int], backend: Backend
+) -> List[AR]:
+    ars = []
+    for points in budgets:
+        ties = backend(infusion, levels, points)
+        ars.append((sum(ties[0][0]) if ties else None) or None)
+    return ars
+
+
+def infusion_ars_entry(weapon_ars: Levels, infusion: Infusion, size: int) -> List[AR]:
+    return (
+        weapon_ars.setdefault(infusion.weapon.type.name, {})
+        .setdefault(infusion.weapon.name, {})
+        .setdefault(infusion.infusion.name, [None] * size)
+    )
+
+
+def catalogue_levels(weapons: Iterable[Weapon], size: int) -> Levels:
+    # Results arrive grouped by fingerprint, so lay the entries out in
+    # catalogue order first to keep plot colours and legends stable.
+    weapon_ars = {}
+    for weapon in weapons:
+        for infusion in weapon.infusions:
+            if infusion is not None:
+                infusion_ars_entry(weapon_ars, infusion, size)
+    return weapon_ars
+
+
+def stream_ars(
+    weapons: Iterable[Weapon],
+    budgets: Sequence[int],
+    levels: Sequence[int],
+    backend: Optional[str] = None,
+    store: Optional[ResultStore] = None,
+) -> Iterator[Tuple[Infusion, List[AR]]]:
+    max_level = get_backend(backend)
+    for members in group_infusions(weapons).values():
+        if store is None:
+            ars = infusion_ars(members[0], budgets, levels, max_level)
+        else:
+            key = store.key(members[0], budgets, levels)
+            ars = store.get(key)
+            if ars is None:
+                ars = infusion_ars(members[0], budgets, levels, max_level)
+                store.put(key, ars)
+        for infusion in members:
+            yield infusion, ars
+    if store is not None:
+        store.prune()
+
+
+STARTING_CLASSES = {
+    "Knight": (13, 12, 9, 9, 7),
+    "Mercenary": (10, 16, 10, 8, 9),
+    "Warrior": (16, 9, 8, 9, 11),
+    "Herald": (12, 11, 8, 13, 11),
+    "Thief": (9, 13, 10, 8, 14),
+    "Assassin": (10, 14, 11, 9, 10),
+    "Sorcerer": (7, 12, 16, 7, 12),
+    "Pyromancer": (12, 9, 14, 14, 7),
+    "Cleric": (12, 8, 7, 16, 13),
+    "Deprived": (10, 10, 10, 10, 10),
+}
+
+
+@dataclasses.dataclass
+class BatchStats:
+    requested: int = 0
+    evaluated: int = 0
+
+
+def stream_bases(
+    weapons: Iterable[Weapon],
+    budgets: Sequence[int],
+    bases: Dict[str, Sequence[int]],
+    backend: Optional[str] = None,
+    stats: Optional[BatchStats] = None,
+) -> Iterator[Tuple[str, Infusion, List[AR]]]:
+    max_level = get_backend(backend)
+    if stats is None:
+        stats = BatchStats()
+    for members in group_infusions(weapons).values():
+        infusion = members[0]
+        # Bases with the same relevant stats only differ in how many points
+        # meeting the requirements costs, so share ARs by points remaining.
+        computed = {}
+        for name, levels in bases.items():
+            key, cost = infusion.base_key(levels)
+            ars = []
+            for points in budgets:
+                stats.requested += 1
+                ar_key = key, points - cost
+                if ar_key not in computed:
+                    stats.evaluated += 1
+                    ties = max_level(infusion, levels, points)
+                    computed[ar_key] = (sum(ties[0][0]) if ties else None) or None
+                ars.append(computed[ar_key])
+            for member in members:
+                yield name, member, ars
+
+
+def find_levels_bases(
+    weapons: List[Weapon],
+    budgets: Sequence[int],
+    bases: Dict[str, Sequence[int]],
+    backend: Optional[str] = None,
+    stats: Optional[BatchStats] = None,
+) -> Dict[str, Levels]:
+    results = {name: catalogue_levels(weapons, len(budgets)) for name in bases}
+    for name, infusion, ars in stream_bases(weapons, budgets, bases, backend, stats):
+        infusion_ars_entry(results[name], infusion, len(budgets))[:] = ars
+    return results
+
+
+class Checkpoint:
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+
+    def load(self, header: dict) -> Dict[ChunkKey, List[AR]]:
+        done = {}
+        try:
+            with self.path.open() as f:
+                lines = f.read().split("\n")
+            found = json.loads(lines[0])
+        except (FileNotFoundError, ValueError):
+            # Missing, or interrupted before the header was fully written.
+            self._write_header(header)
+            return done
+        if found != header:
+            raise ValueError(f"{self.path} was written for different sweep parameters")
+        for line in lines[1:]:
+            try:
+                chunk = json.loads(line)
+            except ValueError:
+                # An interrupted write leaves a partial last line.
+                continue
+            done[tuple(chunk["key"])] = chunk["ars"]
+        return done
+
+    def _write_header(self, header: dict) -> None:
+        with self.path.open("w") as f:
+            f.write(json.dumps(header) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, key: ChunkKey, ars: List[AR]) -> None:
+        with self.path.open("a") as f:
+            f.write("\n" + json.dumps({"key": key, "ars": ars}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def run_sweep(
+    weapons: List[Weapon],
+    budgets: Sequence[int],
+    levels: Sequence[int],
+    checkpoint: Checkpoint,
+    chunk_size: int = 5,
+    backend: Optional[str] = None,
+    on_chunk: Optional[Callable[[], None]] = None,
+) -> Levels:
+    max_level = get_backend(backend)
+    done = checkpoint.load({"budgets": list(budgets), "levels": list(levels)})
+    weapon_ars = catalogue_levels(weapons, len(budgets))
+    for members in group_infusions(weapons).values():
+        for start, stop in chunks(len(budgets), chunk_size):
+            key = chunk_key(members[0], start, stop)
+            ars = done.get(key)
+            if ars is None:
+                ars = infusion_ars(members[0], budgets[start:stop], levels, max_level)
+                checkpoint.append(key, ars)
+                done[key] = ars
+                if on_chunk is not None:
+                    on_chunk()
+            for infusion in members:
+                infusion_ars_entry(weapon_ars, infusion, len(budgets))[start:stop] = ars
+    return weapon_ars
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    index, count = (int(v) for v in value.split("/"))
+    if not 0 <= index < count:
+        raise ValueError(f"shard {value} must be in 0/{count} to {count - 1}/{count}")
+    return index, count
+
+
+def shard_of(weapon: Weapon, count: int) -> int:
+    return zlib.crc32(str(weapon.id).encode("utf-8")) % count
+
+
+class ShardDirectory:
+    def __init__(self, path: pathlib.Path, count: int) -> None:
+        self.path = path
+        self.count = count
+
+    def _path(self, index: int, suffix: str) -> pathlib.Path:
+        return self.path / f"shard-{index}-of-{self.count}{suffix}"
+
+    def result_path(self, index: int) -> pathlib.Path:
+        return self._path(index, ".json")
+
+    def checkpoint(self, index: int) -> Checkpoint:
+        return Checkpoint(self._path(index, ".jsonl"))
+
+    def _lock(self, index: int) -> pathlib.Path:
+        return self._path(index, ".lock")
+
+    def _reclaim(self, lock: pathlib.Path, stale: float) -> None:
+        try:
+            if time.time() - lock.stat().st_mtime <= stale:
+                return
+            # Renaming is atomic, so only one worker takes the stale lock.
+            taken = lock.with_name(f"{lock.name}.{socket.gethostname()}.{os.getpid()}")
+            os.rename(lock, taken)
+        except FileNotFoundError:
+            return
+        if time.time() - taken.stat().st_mtime <= stale:
+            # Another worker reclaimed it first and this is their fresh lock.
+            try:
+                os.link(taken, lock)
+            except FileExistsError:
+                pass
+        taken.unlink()
+
+    def claim(self, index: int, stale: Optional[float] = None) -> bool:
+        lock = self._lock(index)
+        if stale is not None:
+            self._reclaim(lock, stale)
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(f"{socket.gethostname()} {os.getpid()}\n")
+        return True
+
+    def heartbeat(self, index: int) -> None:
+        # Keep the lock fresh so a running shard is not taken as stale.
+        try:
+            os.utime(self._lock(index))
+        except FileNotFoundError:
+            pass
+
+    def save(self, index: int, result: dict) -> None:
+        path = self.result_path(index)
+        tmp = path.with_name(f"{path.name}.{socket.gethostname()}.{os.getpid()}")
+        with tmp.open("w") as f:
+            json.dump(result, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def load(self, index: int) -> dict:
+        with self.result_path(index).open() as f:
+            return json.load(f)
+
+
+def run_shard(
+    weapons: List[Weapon],
+    budgets: Sequence[int],
+    levels: Sequence[int],
+    shards: ShardDirectory,
+    index: int,
+    chunk_size: int = 5,
+    backend: Optional[str] = None,
+    on_chunk: Optional[Callable[[], None]] = None,
+) -> pathlib.Path:
+    shards.path.mkdir(parents=True, exist_ok=True)
+    results = run_sweep(
+        [w for w in weapons if shard_of(w, shards.count) == index],
+        budgets,
+        levels,
+        shards.checkpoint(index),
+        chunk_size,
+        backend,
+        on_chunk,
+    )
+    shards.save(
+        index, {"budgets": list(budgets), "levels": list(levels), "results": results}
+    )
+    return shards.result_path(index)
+
+
+def work(
+    weapons: List[Weapon],
+    budgets: Sequence[int],
+    levels: Sequence[int],
+    shards: ShardDirectory,
+    chunk_size: int = 5,
+    backend: Optional[str] = None,
+    stale: Optional[float] = None,
+) -> List[int]:
+    shards.path.mkdir(parents=True, exist_ok=True)
+    done = []
+    for index in range(shards.count):
+        if shards.result_path(index).exists() or not shards.claim(index, stale):
+            continue
+        run_shard(
+            weapons,
+            budgets,
+            levels,
+            shards,
+            index,
+            chunk_size,
+            backend,
+            functools.partial(shards.heartbeat, index),
+        )
+        done.append(index)
+    return done
+
+
+def merge_shards(
+    weapons: List[Weapon],
+    budgets: Sequence[int],
+    levels: Sequence[int],
+    shards: ShardDirectory,
+) -> Levels:
+    missing = [i for i in range(shards.count) if not shards.result_path(i).exists()]
+    if missing:
+        raise ValueError(f"{shards.path} is missing results for shards {missing}")
+    ars = {}
+    for index in range(shards.count):
+        shard = shards.load(index)
+        if shard["budgets"] != list(budgets) or shard["levels"] != list(levels):
+            raise ValueError(
+                f"{shards.result_path(index)} was written for different sweep "
+                "parameters"
+            )
+        for weapon_type, weapon_infusions in shard["results"].items():
+            for weapon, infusions in weapon_infusions.items():
+                for infusion, values in infusions.items():
+                    ars[weapon_type, weapon, infusion] = values
+
+    weapon_ars = catalogue_levels(weapons, len(budgets))
+    incomplete = set()
+    for members in group_infusions(weapons).values():
+        for infusion in members:
+            key = (
+                infusion.weapon.type.name,
+                infusion.weapon.name,
+                infusion.infusion.name,
+            )
+            if key not in ars:
+                incomplete.add(shard_of(infusion.weapon, shards.count))
+                continue
+            infusion_ars_entry(weapon_ars, infusion, len(budgets))[:] = ars[key]
+    if incomplete:
+        raise ValueError(
+            f"{shards.path} has incomplete results for shards {sorted(incomplete)}"
+        )
+    return weapon_ars
@@ -0,0 +1,83 @@
+import functools
+import itertools
+import operator
+from typing import Callable, Generic, Iterable, Iterator, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def _concat(*parts: Tuple[T, ...]) -> Tuple[T, ...]:
+    return tuple(itertools.chain.from_iterable(parts))
+
+
+class Ties(Generic[T]):
+    """Equally optimal builds stored as a product of small sets."""
+
+    def __init__(
+        self,
+        factors: Iterable[Sequence[Tuple[T, ...]]],
+        build: Callable[..., Tuple[T, ...]] = _concat,
+    ) -> None:
+        self.factors: List[Sequence[Tuple[T, ...]]] = list(factors)
+        self.build = build
+
+    def __len__(self) -> int:
+        return functools.reduce(operator.mul, map(len, self.factors), 1)
+
+    def count(self) -> int:
+        return len(self)
+
+    def __iter__(self) -> Iterator[Tuple[T, ...]]:
+        return itertools.starmap(self.build, itertools.product(*self.factors))
+
+    def __getitem__(self, index: int) -> Tuple[T, ...]:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("tie index out of range")
+        parts = []
+        for factor in reversed(self.factors):
+            index, i = divmod(index, len(factor))
+            parts.append(factor[i])
+        return self.build(*reversed(parts))
+
+    def take(self, n: int) -> List[Tuple[T, ...]]:
+        return list(itertools.islice(self, n))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(count={len(self)})"
+
+
+class TiesUnion(Generic[T]):
+    """Equally optimal builds stored as a union of disjoint ``Ties``."""
+
+    def __init__(self, parts: Iterable[Ties[T]]) -> None:
+        self.parts: List[Ties[T]] = list(parts)
+
+    def __len__(self) -> int:
+        return sum(map(len, self.parts))
+
+    def count(self) -> int:
+        return len(self)
+
+    def __iter__(self) -> Iterator[Tuple[T, ...]]:
+        return itertools.chain.from_iterable(self.parts)
+
+    def __getitem__(self, index: int) -> Tuple[T, ...]:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("tie index out of range")
+        for part in self.parts:
+            if index < len(part):
+                return part[index]
+            index -= len(part)
+        raise IndexError("tie index out of range")
+
+    def take(self, n: int) -> List[Tuple[T, ...]]:
+        return list(itertools.islice(self, n))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(count={len(self)})"
@@ -2,7 +2,24 @@ from __future__ import annotations
 
 import dataclasses
 import enum
-from typing import List, Tuple, cast
+import functools
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    cast,
+    overload,
+)
+
+from .curves import bounded_max, bounded_ties
+
+# An AR of 0, e.g. when the requirements can't be met, is stored as None.
+AR = Optional[int]
+Levels = Dict[str, Dict[str, Dict[str, List[AR]]]]
 
 
 class WeaponType(enum.Enum):
@@ -88,6 +105,10 @@ class SaturationCurve:
     lightning: List[float]
     dark: List[float]
 
+    @functools.cached_property
+    def key(self) -> Tuple[Tuple[float, ...], ...]:
+        return tuple(tuple(curve) for curve in dataclasses.astuple(self))
+
 
 @dataclasses.dataclass
 class Requirements:
@@ -128,6 +149,17 @@ class Infusion:
     def magic_blessed(self) -> bool:
         return self.weapon.name == "Golden Ritual Spear"
 
+    @property
+    def fingerprint(self) -> Hashable:
+        return (
+            dataclasses.astuple(self.damage),
+            dataclasses.astuple(self.scaling),
+            dataclasses.astuple(self.weapon.requirements),
+            self.saturation.key,
+            self.physical_blessed,
+            self.magic_blessed,
+        )
+
     def damage_increases(self) -> Tuple[bool, bool, bool, bool, bool]:
         increases = [False, False, False, False, False]
         str, dex, int, faith, luck = 0, 1, 2, 3, 4
@@ -229,7 +261,45 @@ class Infusion:
             ),
         )
 
-    def _levels(self, levels, points):
+    @property
+    def coefficients(self) -> Tuple[Tuple[float, ...], ...]:
+        scaling = self.scaling
+        physical_faith = scaling.faith if self.physical_blessed else 0
+        magic_faith = scaling.faith if self.magic_blessed else 0
+        return (
+            (scaling.str, scaling.dex, 0, physical_faith, scaling.luck),
+            (0, 0, scaling.int, magic_faith, 0),
+            (0, 0, scaling.int, scaling.faith, 0),
+            (0, 0, 0, scaling.faith, 0),
+            (0, 0, scaling.int, scaling.faith, 0),
+        )
+
+    @functools.cached_property
+    def stat_tables(self) -> Tuple[Tuple[float, ...], ...]:
+        weights = [
+            [
+                (damage * row[stat], curve)
+                for damage, row, curve in zip(
+                    dataclasses.astuple(self.damage),
+                    self.coefficients,
+                    (
+                        self.saturation.physical,
+                        self.saturation.magic,
+                        self.saturation.fire,
+                        self.saturation.lightning,
+                        self.saturation.dark,
+                    ),
+                )
+                if damage * row[stat]
+            ]
+            for stat in range(5)
+        ]
+        return tuple(
+            tuple(sum(w * curve[level] for w, curve in weight) for level in range(100))
+            for weight in weights
+        )
+
+    def _start(self, levels, points):
         links = [
             i
             for i, (v, d) in enumerate(zip(levels, self.damage_increases()))
@@ -249,6 +319,24 @@ class Infusion:
         if levels[3] < requirements.faith:
             points -= requirements.faith - levels[3]
             levels[3] = requirements.faith
+        return links, levels, points
+
+    def base_key(self, levels) -> Tuple[Hashable, int]:
+        links, start, remaining = self._start(levels, 0)
+        damage = dataclasses.astuple(self.damage)
+        relevant = [
+            i in links or any(d and row[i] for d, row in zip(damage, self.coefficients))
+            for i in range(5)
+        ]
+        key = (
+            tuple(links),
+            tuple(level if r else None for level, r in zip(start, relevant)),
+            any(i > 99 for i in start),
+        )
+        return key, -remaining
+
+    def _levels(self, levels, points):
+        links, levels, points = self._start(levels, points)
         try:
             limit_delta = min(levels[i] for i in links)
         except ValueError:
@@ -265,18 +353,60 @@ class Infusion:
         for level in self._levels(levels, points):
             yield self.damages(*level), level
 
-    def max_level(self, levels, points):
-        values = sorted(
-            self.level(levels, points), key=lambda i: sum(i[0]), reverse=True
-        )
+    def _max_level(self, levels, points):
         max_ar = None
-        for value in values:
+        ties = []
+        for value in self.level(levels, points):
             ar = sum(value[0])
-            if max_ar is None:
+            if max_ar is None or ar > max_ar:
                 max_ar = ar
-            if ar != max_ar:
-                break
-            yield value
+                ties = [value]
+            elif ar == max_ar:
+                ties.append(value)
+        yield from ties
+
+    def _search_args(self, levels, points):
+        links, start, remaining = self._start(levels, points)
+        if remaining < 0 or not links or any(i > 99 for i in start):
+            return None
+        tables = self.stat_tables
+        offset = sum(dataclasses.astuple(self.damage)) + sum(
+            tables[i][start[i]] for i in range(5) if i not in links
+        )
+
+        def build(allocation):
+            level = list(start)
+            for i, value in zip(links, allocation):
+                level[i] += value
+            return level
+
+        return (
+            [tables[i][start[i] :] for i in links],
+            remaining,
+            lambda allocation: sum(self.damages(*build(allocation))),
+            offset,
+        ), build
+
+    def max_level(self, levels, points):
+        search = self._search_args(levels, points)
+        if search is None:
+            yield from self._max_level(levels, points)
+            return
+        args, build = search
+        for allocation in bounded_ties(*args):
+            level = build(allocation)
+            yield self.damages(*level), level
+
+    def count_ties(self, levels, points) -> int:
+        return sum(1 for _ in self.max_level(levels, points))
+
+    def max_ar(self, levels, points) -> int:
+        search = self._search_args(levels, points)
+        if search is None:
+            for damages, _ in self._max_level(levels, points):
+                return sum(damages)
+            return 0
+        return int(bounded_max(*search[0]) or 0)
 
 
 def sigma_combinations(points, n, limit=None):
@@ -333,6 +463,27 @@ class Infusions:
         )
 
 
+class _LazyInfusions:
+    @overload
+    def __get__(self, weapon: None, owner: type) -> None: ...
+
+    @overload
+    def __get__(self, weapon: Weapon, owner: type) -> Infusions: ...
+
+    def __get__(self, weapon: Optional[Weapon], owner: type) -> Optional[Infusions]:
+        if weapon is None:
+            return None
+        infusions = weapon.__dict__.get("_infusions")
+        if infusions is None:
+            if weapon.source is None:
+                raise AttributeError(f"{weapon.name!r} has no infusions")
+            infusions = weapon.__dict__["_infusions"] = weapon.source(weapon)
+        return infusions
+
+    def __set__(self, weapon: Weapon, infusions: Optional[Infusions]) -> None:
+        weapon.__dict__["_infusions"] = infusions
+
+
 @dataclasses.dataclass
 class Weapon:
     name: str
@@ -346,7 +497,12 @@ class Weapon:
     defence: Damage
     infusable: bool
     dual_wield: bool
-    infusions: Infusions
+    # Built from ``source`` on first access when not passed in.
+    infusions: _LazyInfusions = _LazyInfusions()
+    # Builds the infusions from the raw record and the loader's context.
+    source: Optional[Callable[[Weapon], Infusions]] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def max_level(self, level: Tuple[int, int, int, int, int], n: int):
         for infusion in self.infusions:
@@ -357,3 +513,19 @@ class Weapon:
                 yield sum(ls[0][0]), ls, infusion
             else:
                 yield 0, ls, infusion
+
+
+def group_infusions(weapons: Iterable[Weapon]) -> Dict[Hashable, List[Infusion]]:
+    groups = {}
+    for weapon in weapons:
+        for infusion in weapon.infusions:
+            if infusion is not None:
+                groups.setdefault(infusion.fingerprint, []).append(infusion)
+    return groups
+
+
+def dedup_ratio(groups: Dict[Hashable, List[Infusion]]) -> float:
+    total = sum(map(len, groups.values()))
+    if not total:
+        return 0.0
+    return 1 - len(groups) / total
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from dark_souls.loaders import Cache
+
+
+def _curve(knots):
+    values = []
+    for (x0, y0), (x1, y1) in zip(knots, knots[1:]):
+        for x in range(x0, x1):
+            values.append(y0 + (y1 - y0) * (x - x0) / (x1 - x0))
+    values.append(knots[-1][1])
+    return values
+
+
+CURVES = {
+    "0": _curve([(0, 0.0), (10, 0.0), (20, 0.35), (40, 0.75), (60, 0.9), (99, 1.0)]),
+    "1": _curve([(0, 0.0), (10, 0.0), (30, 0.5), (50, 0.8), (99, 1.0)]),
+    "4": _curve([(0, 0.0), (10, 0.0), (25, 0.4), (40, 0.7), (60, 0.85), (99, 1.0)]),
+}
+
+
+def weapon_record(id, name, weapon_type, reqs, infusions):
+    base_damage = [0] * 80
+    scaling = [0] * 80
+    stat_funcs = [0] * 80
+    for index, (damage, scale, funcs) in infusions.items():
+        base_damage[index * 5 : index * 5 + 5] = damage
+        scaling[index * 4 : index * 4 + 4] = scale[:4]
+        scaling[64 + index] = scale[4]
+        stat_funcs[index * 5 : index * 5 + 5] = funcs
+    return {
+        "name": name,
+        "id": id,
+        "weapon_type": weapon_type,
+        "weight": "5.5",
+        "bleed": "0",
+        "poison": "0",
+        "frost": "0",
+        "strength_req": reqs[0],
+        "dex_req": reqs[1],
+        "intelligence_req": reqs[2],
+        "faith_req": reqs[3],
+        "physical_def": "40",
+        "magic_def": "15",
+        "fire_def": "15",
+        "lightning_def": "15",
+        "dark_def": "15",
+        "infusable": True,
+        "dual_wield": False,
+        "base_damage": base_damage,
+        "scaling_coefficients": scaling,
+        "stat_funcs": stat_funcs,
+    }
+
+
+# Scaling is ordered (str, dex, faith, luck, int) as in the upstream data.
+WEAPONS = [
+    weapon_record(
+        "1",
+        "Uchigatana",
+        "Katana",
+        (11, 16, 0, 0),
+        {
+            0: ([130, 0, 0, 0, 0], [40, 70, 0, 0, 0], [0, 1, 1, 1, 1]),
+            2: ([125, 0, 0, 0, 0], [20, 100, 0, 0, 0], [0, 1, 1, 1, 1]),
+            6: ([105, 0, 105, 0, 0], [30, 30, 40, 0, 40], [0, 1, 4, 1, 1]),
+        },
+    ),
+    weapon_record(
+        "2",
+        "Broadsword",
+        "Straight Sword",
+        (10, 10, 0, 0),
+        {
+            0: ([145, 0, 0, 0, 0], [70, 40, 0, 0, 0], [0, 1, 1, 1, 1]),
+            1: ([150, 0, 0, 0, 0], [100, 0, 0, 0, 0], [0, 1, 1, 1, 1]),
+            12: ([125, 0, 0, 0, 0], [40, 40, 0, 30, 0], [0, 1, 1, 1, 1]),
+        },
+    ),
+    weapon_record(
+        "3",
+        "Washing Pole",
+        "Katana",
+        (20, 16, 0, 0),
+        {0: ([135, 0, 0, 0, 0], [50, 60, 0, 0, 0], [0, 1, 1, 1, 1])},
+    ),
+    weapon_record(
+        "4",
+        "Black Blade",
+        "Katana",
+        (11, 16, 0, 0),
+        {
+            0: ([130, 0, 0, 0, 0], [40, 70, 0, 0, 0], [0, 1, 1, 1, 1]),
+            2: ([125, 0, 0, 0, 0], [20, 100, 0, 0, 0], [0, 1, 1, 1, 1]),
+        },
+    ),
+]
+
+
+@pytest.fixture
+def curves():
+    return {k: list(v) for k, v in CURVES.items()}
+
+
+@pytest.fixture
+def weapon_records():
+    return json.loads(json.dumps(WEAPONS))
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(Cache, "PATH", tmp_path / "cache")
+    Cache.save_weapons(json.loads(json.dumps(WEAPONS)))
+    Cache.save_misc_data(CURVES)
+    return Cache
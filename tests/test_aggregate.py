@@ -0,0 +1,39 @@
+from dark_souls.__main__ import BASE_LEVELS, extract_groups_data, find_levels
+from dark_souls.aggregate import GroupAggregator
+from dark_souls.loaders import Loader
+from dark_souls.sweeps import stream_ars
+from dark_souls.weapons import WeaponType
+
+
+def _materialized_groups(levels):
+    for weapon_type_key, weapons in levels.items():
+        values = {
+            weapon_name: [
+                (
+                    max([a for a in ars if a is not None], default=None),
+                    min([a for a in ars if a is not None], default=None),
+                )
+                for ars in zip(*weapon.values())
+            ]
+            for weapon_name, weapon in weapons.items()
+        }
+        yield WeaponType[weapon_type_key].value, values
+
+
+def test_streamed_groups_match_materialized_levels(cache):
+    weapons = list(Loader.load_weapons())
+    domain = range(0, 15)
+    levels = find_levels(weapons, domain)
+    expected = list(_materialized_groups(levels))
+
+    assert list(extract_groups_data(levels)) == expected
+    aggregator = (
+        GroupAggregator(len(domain))
+        .reserve(weapons)
+        .consume(stream_ars(weapons, domain, BASE_LEVELS))
+    )
+    groups = list(aggregator.groups())
+    assert groups == expected
+    assert [(name, list(group)) for name, group in groups] == [
+        (name, list(group)) for name, group in expected
+    ]
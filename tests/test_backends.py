@@ -0,0 +1,66 @@
+import pytest
+
+from dark_souls.__main__ import main
+from dark_souls.backends import BACKENDS, KernelArgs, benchmark, get_backend
+from dark_souls.loaders import Loader
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "python",
+        "search",
+        pytest.param(
+            "numba",
+            marks=pytest.mark.skipif(
+                "numba" not in BACKENDS, reason="numba isn't installed"
+            ),
+        ),
+    ],
+)
+def test_backend_parity(cache, name):
+    backend = BACKENDS[name]
+    for weapon in Loader.load_weapons():
+        for infusion in weapon.infusions:
+            if infusion is None:
+                continue
+            for base in [(10, 10, 10, 10, 10), (40, 12, 8, 9, 99)]:
+                for points in [0, 7, 12, 30, 50]:
+                    assert backend(infusion, base, points) == BACKENDS["enumerate"](
+                        infusion, base, points
+                    )
+
+
+def test_get_backend_falls_back_to_python(monkeypatch):
+    monkeypatch.delitem(BACKENDS, "numba", raising=False)
+    assert get_backend("numba") is BACKENDS["python"]
+    assert get_backend() is BACKENDS["search"]
+
+
+def test_bench_command(cache, capsys):
+    main(["bench", "--points", "20", "--infusions", "2"])
+    output = capsys.readouterr().out
+    assert "20 points:" in output
+    assert "python:" in output
+
+
+def test_numba_choice_without_numba(cache, monkeypatch, capsys):
+    monkeypatch.delitem(BACKENDS, "numba", raising=False)
+    main(["bench", "--points", "20", "--infusions", "1", "--backends", "numba"])
+    assert "numba:" in capsys.readouterr().out
+
+
+def test_benchmark_warms_up_the_kernel(cache, monkeypatch):
+    infusions = [w.infusions.none for w in Loader.load_weapons()][:2]
+    kernel_calls = []
+    python = BACKENDS["python"]
+
+    def spy(infusion, levels, points):
+        args = KernelArgs.from_infusion(infusion, levels, points)
+        kernel_calls.append(args is not None)
+        return python(infusion, levels, points)
+
+    monkeypatch.setitem(BACKENDS, "spy", spy)
+    timings = benchmark(infusions, (10, 10, 10, 10, 10), [50, 70], ["spy"])
+    assert list(timings) == [50, 70]
+    assert kernel_calls[: len(infusions)] == [True] * len(infusions)
@@ -0,0 +1,70 @@
+import itertools
+
+from dark_souls import curves
+from dark_souls.curves import analyse_curves, bounded_max, bounded_ties, max_plus
+from dark_souls.loaders import Loader
+
+
+def test_analyse_curves(curves):
+    analysis = analyse_curves(curves)["0"]
+    assert analysis.breakpoints == [10, 20, 40, 60]
+    assert analysis.concave_from == 10
+    assert not analysis.concave
+
+
+def test_max_plus_matches_brute_force():
+    a = [0, 0, 1, 3, 4, 4]
+    b = [0, 2, 3, 3.5]
+    expected = [
+        max(a[i] + b[p - i] for i in range(len(a)) if 0 <= p - i < len(b))
+        for p in range(len(a) + len(b) - 1)
+    ]
+    assert max_plus(a, b) == expected
+    assert max_plus([0, 3, 5, 6], b) == [0, 3, 5, 7, 8, 9, 9.5]
+
+
+def test_bounded_search_matches_brute_force():
+    tables = [[0, 0, 1, 3, 4], [0, 2, 3, 3, 3], [0, 1, 2, 3, 4]]
+
+    def score(allocation):
+        return sum(t[i] for t, i in zip(tables, allocation))
+
+    for points in range(13):
+        allocations = [
+            a for a in itertools.product(range(5), repeat=3) if sum(a) == points
+        ]
+        best = max(sum(t[i] for t, i in zip(tables, a)) for a in allocations)
+        ties = [a for a in allocations if sum(t[i] for t, i in zip(tables, a)) == best]
+        assert bounded_max(tables, points, score) == best
+        lazy = bounded_ties(tables, points, score)
+        assert next(lazy) == ties[0]
+        assert [ties[0], *lazy] == ties
+
+
+def test_max_level_matches_enumeration(cache):
+    for weapon in Loader.load_weapons():
+        for infusion in weapon.infusions:
+            if infusion is None:
+                continue
+            for base in [(10, 10, 10, 10, 10), (40, 12, 8, 9, 99)]:
+                for points in [0, 7, 12, 30, 70]:
+                    expected = list(infusion._max_level(base, points))
+                    assert list(infusion.max_level(base, points)) == expected
+                    assert infusion.count_ties(base, points) == len(expected)
+                    assert infusion.max_ar(base, points) == (
+                        sum(expected[0][0]) if expected else 0
+                    )
+
+
+def test_max_level_computes_suffixes_once(cache, monkeypatch):
+    calls = []
+    suffix_maxima = curves.suffix_maxima
+
+    def spy(*args):
+        calls.append(args)
+        return suffix_maxima(*args)
+
+    monkeypatch.setattr(curves, "suffix_maxima", spy)
+    (weapon,) = Loader.load_weapons(names=["Uchigatana"])
+    assert list(weapon.infusions.none.max_level((10, 10, 10, 10, 10), 30))
+    assert len(calls) == 1
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from dark_souls.__main__ import find_levels, main
+from dark_souls.diff import CatalogueDiff, compare_levels
+from dark_souls.loaders import Loader
+
+
+def _save(path, weapons, curves):
+    path.mkdir()
+    (path / "weapons.json").write_text(json.dumps(weapons))
+    (path / "misc.json").write_text(json.dumps(curves))
+    return path
+
+
+def _patch(weapon_records, curves):
+    weapons = json.loads(json.dumps(weapon_records))
+    curves = dict(curves, **{"4": [v * 1.5 for v in curves["4"]]})
+    weapons[1]["strength_req"] = 14
+    del weapons[2]
+    return weapons, curves
+
+
+def test_catalogue_diff(weapon_records, curves):
+    diff = CatalogueDiff.from_catalogues(
+        (weapon_records, curves), _patch(weapon_records, curves)
+    )
+    assert diff.curves == ["4"]
+    assert diff.changed == ["2"]
+    assert diff.removed == ["3"]
+    assert diff.added == []
+    assert diff.affected == ["1", "2"]
+
+
+def test_diff_command(tmp_path, weapon_records, curves, capsys):
+    domain = range(0, 15)
+    old = _save(tmp_path / "old", weapon_records, curves)
+    new = _save(tmp_path / "new", *_patch(weapon_records, curves))
+    results = tmp_path / "results.json"
+    old_levels = find_levels(list(Loader.from_data(weapon_records, curves)), domain)
+    results.write_text(json.dumps(old_levels))
+    output = tmp_path / "output.json"
+
+    main(
+        [
+            "diff",
+            str(old),
+            str(new),
+            "--levels",
+            "15",
+            "--results",
+            str(results),
+            "--output",
+            str(output),
+        ]
+    )
+
+    expected = find_levels(
+        list(Loader.from_data(*_patch(weapon_records, curves))), domain
+    )
+    assert json.loads(output.read_text()) == expected
+    assert output.read_text() == json.dumps(expected)
+    changes = compare_levels(old_levels, expected, len(domain))
+    assert {(c.weapon, c.infusion) for c in changes} == {
+        ("Uchigatana", "FIRE"),
+        ("Broadsword", "NONE"),
+        ("Broadsword", "HEAVY"),
+        ("Broadsword", "BLOOD"),
+    }
+    assert "Curves changed: 4" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        main(["diff", str(old), str(new), "--output", str(tmp_path / "partial.json")])
+    assert not (tmp_path / "partial.json").exists()
@@ -0,0 +1,40 @@
+from dark_souls.__main__ import main
+from dark_souls.inverse import min_points, points_limit, rank_min_points
+from dark_souls.loaders import Loader
+
+BASE = (10, 10, 10, 10, 10)
+
+
+def _linear(infusion, target):
+    for points in range(0, points_limit(infusion, BASE) + 1):
+        if infusion.max_ar(BASE, points) >= target:
+            return points
+    return None
+
+
+def test_min_points_matches_linear_scan(cache):
+    for weapon in Loader.load_weapons():
+        for infusion in weapon.infusions:
+            if infusion is None:
+                continue
+            assert min_points(infusion, BASE, 400) is None
+            for target in [150, 200, 250]:
+                result = min_points(infusion, BASE, target)
+                expected = _linear(infusion, target)
+                if expected is None:
+                    assert result is None
+                    continue
+                assert result.points == expected
+                assert result.ar == infusion.max_ar(BASE, expected)
+                assert result.ties == list(infusion.max_level(BASE, expected))
+
+
+def test_rank_min_points(cache, capsys):
+    results = rank_min_points(list(Loader.load_weapons()), BASE, 200)
+    assert [r.points for r in results] == sorted(r.points for r in results)
+    assert all(r.ar >= 200 for r in results)
+    main(["target", "200", "--top", "1"])
+    first = results[0]
+    assert capsys.readouterr().out.startswith(
+        f"{first.points}: {first.infusion.weapon.name}[{first.infusion.infusion.name}]"
+    )
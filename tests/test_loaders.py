@@ -0,0 +1,181 @@
+import asyncio
+import dataclasses
+import http.server
+import json
+import pickle
+import threading
+import time
+import urllib.parse
+
+import pytest
+
+from dark_souls.__main__ import main
+from dark_souls.loaders import AsyncLoader, AsyncWeb, Cache, Loader, Web
+from dark_souls.weapons import WeaponInfusion, WeaponType
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    requests = []
+    weapons = []
+    curves = {}
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        per_page = int(query["per_page"][0])
+        page = int(query["page"][0])
+        type(self).requests.append((url.path, page))
+        start = page * per_page
+        if url.path == "/ds3_weapons":
+            weapons = self.weapons[start : start + per_page]
+            body = {
+                "results": [{"key": "ds3_weapons", "id": w["id"]} for w in weapons],
+                "ds3_weapons": {
+                    w["id"]: dict(w, base_damage=json.dumps(w["base_damage"]))
+                    for w in weapons
+                },
+            }
+        else:
+            keys = sorted(self.curves)[start : start + per_page]
+            body = {
+                "dark_souls_3": {
+                    "scaling_saturation_curves": {
+                        k: [v * 100 for v in self.curves[k]] for k in keys
+                    }
+                }
+            }
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch, weapon_records, curves):
+    StubHandler.requests = []
+    StubHandler.weapons = weapon_records
+    StubHandler.curves = curves
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    monkeypatch.setattr(Web, "WEAPONS_URL", url + "/ds3_weapons")
+    monkeypatch.setattr(Web, "MISC_DATA_URL", url + "/misc_data")
+    monkeypatch.setattr(Cache, "PATH", tmp_path / "cache")
+    yield StubHandler
+    httpd.shutdown()
+    httpd.server_close()
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+def test_async_loader_matches_loader(server, weapon_records):
+    weapons = asyncio.run(_collect(AsyncLoader.load_weapons()))
+    assert Cache.weapons_path().exists()
+    assert Cache.misc_path().exists()
+    assert [w.name for w in weapons] == [w["name"] for w in weapon_records]
+    assert list(map(repr, weapons)) == list(map(repr, Loader.load_weapons()))
+    assert [repr(w.infusions) for w in weapons] == [
+        repr(w.infusions) for w in Loader.load_weapons()
+    ]
+
+
+def test_async_loader_fetches_pages_concurrently(server):
+    weapons = asyncio.run(AsyncWeb.load_weapons(per_page=1, concurrency=2))
+    assert [w["id"] for w in weapons] == ["1", "2", "3", "4"]
+    pages = sorted(page for path, page in server.requests if path == "/ds3_weapons")
+    assert pages[:5] == [0, 1, 2, 3, 4]
+    assert len(pages) <= 6
+
+
+def test_async_loader_stops_after_short_page(server):
+    asyncio.run(AsyncWeb.load_weapons())
+    assert server.requests == [("/ds3_weapons", 0)]
+    with pytest.raises(ValueError):
+        asyncio.run(AsyncWeb.load_weapons(concurrency=0))
+
+
+def test_async_web_drains_pages_after_error(monkeypatch):
+    finished = []
+
+    def get(url, per_page, page):
+        if page == 1:
+            raise ConnectionError("page 1")
+        if page > 1:
+            time.sleep(0.05)
+            finished.append(page)
+        return {"count": per_page}
+
+    async def fetch():
+        with pytest.raises(ConnectionError):
+            await AsyncWeb._gets("url", 1, 1, lambda data: data["count"], 3)
+        return sorted(finished)
+
+    monkeypatch.setattr(Web, "_get", get)
+    assert asyncio.run(fetch()) == [2, 3]
+
+
+def test_async_loader_uses_cache(server, curves):
+    first = asyncio.run(AsyncLoader.load_misc_data())
+    count = len(server.requests)
+    second = asyncio.run(AsyncLoader.load_misc_data())
+    assert len(server.requests) == count
+    assert second == first
+    assert {k: pytest.approx(v) for k, v in curves.items()} == second
+
+
+def test_infusions_are_built_lazily(cache, monkeypatch):
+    calls = []
+    build = Loader._build_infusions
+
+    def spy(*args):
+        calls.append(args[1]["name"])
+        return build(*args)
+
+    monkeypatch.setattr(Loader, "_build_infusions", spy)
+    weapons = list(Loader.load_weapons())
+    assert calls == []
+    assert weapons[1].infusions.heavy.damage.physical == 150
+    assert calls == ["Broadsword"]
+    weapons[1].infusions
+    assert calls == ["Broadsword"]
+
+
+def test_weapons_accept_prebuilt_infusions(cache):
+    weapon = next(Loader.load_weapons())
+    copy = dataclasses.replace(weapon, infusions=weapon.infusions)
+    assert copy.source is None
+    assert copy.infusions is weapon.infusions
+    assert copy == weapon
+    assert "infusions=Infusions(" in repr(weapon)
+
+
+def test_weapons_pickle(cache):
+    for weapon in Loader.load_weapons():
+        copy = pickle.loads(pickle.dumps(weapon))
+        assert repr(copy.infusions) == repr(weapon.infusions)
+        assert copy.infusions.none.weapon is copy
+
+
+def test_load_weapons_filters(cache):
+    katanas = list(Loader.load_weapons(types=[WeaponType.KATANA]))
+    assert [w.name for w in katanas] == ["Uchigatana", "Washing Pole", "Black Blade"]
+    (weapon,) = Loader.load_weapons(
+        names=["Uchigatana"], infusions=[WeaponInfusion.SHARP]
+    )
+    assert [i.infusion for i in weapon.infusions if i is not None] == [
+        WeaponInfusion.SHARP
+    ]
+
+
+def test_unknown_infusion_is_a_usage_error(capsys):
+    with pytest.raises(SystemExit):
+        main(["bench", "--infusion", "bogus"])
+    assert "unknown infusion 'bogus'" in capsys.readouterr().err
@@ -0,0 +1,47 @@
+import pytest
+
+from dark_souls.__main__ import main
+from dark_souls.loaders import Loader
+from dark_souls.marginal import marginal_value, marginal_values
+
+
+def test_marginal_values_match_direct_evaluation(cache):
+    levels = (18, 20, 10, 10, 7)
+    values = marginal_values(list(Loader.load_weapons()), levels)
+    assert len(values) == 9
+    assert [v.key for v in values] == sorted((v.key for v in values), reverse=True)
+    for value in values:
+        infusion = value.infusion
+        for stat in range(5):
+            next_levels = list(levels)
+            next_levels[stat] += 1
+            assert value.gains[stat] == sum(infusion.damages(*next_levels)) - sum(
+                infusion.damages(*levels)
+            )
+
+
+def test_marginal_value_meeting_requirements(cache):
+    (weapon,) = Loader.load_weapons(names=["Uchigatana"])
+    value = marginal_value(weapon.infusions.none, (11, 15, 10, 10, 7))
+    assert value.ar == 0
+    assert value.best == 1
+    assert value.gains[1] == sum(weapon.infusions.none.damages(11, 16, 10, 10, 7))
+    assert value.gains[0] == 0
+
+
+def test_advise_command(cache, capsys):
+    main(["advise", "18", "20", "10", "10", "7", "--top", "3"])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    assert lines[0].startswith("str: Broadsword[HEAVY]")
+
+
+def test_stats_are_validated(cache, capsys):
+    (weapon,) = Loader.load_weapons(names=["Uchigatana"])
+    assert marginal_value(weapon.infusions.none, (99, 99, 99, 99, 99)).gains == (0,) * 5
+    for levels in [(100, 10, 10, 10, 10), (10, -1, 10, 10, 10), (10, 10, 10, 10)]:
+        with pytest.raises(ValueError):
+            marginal_value(weapon.infusions.none, levels)
+    with pytest.raises(SystemExit):
+        main(["advise", "100", "20", "10", "10", "7"])
+    assert "between 1 and 99" in capsys.readouterr().err
@@ -0,0 +1,49 @@
+import os
+
+from dark_souls.__main__ import find_levels, main
+from dark_souls.backends import BACKENDS
+from dark_souls.loaders import Loader
+from dark_souls.store import ResultStore
+
+
+def test_find_levels_reuses_stored_results(cache, tmp_path, monkeypatch):
+    weapons = list(Loader.load_weapons())
+    store = ResultStore(tmp_path / "results")
+    expected = find_levels(weapons, range(0, 12))
+    assert find_levels(weapons, range(0, 12), store=store) == expected
+    assert store.info()[0] == 7
+
+    def fail(*args):
+        raise AssertionError("optimizer shouldn't run")
+
+    monkeypatch.setitem(BACKENDS, "fail", fail)
+    assert find_levels(weapons, range(0, 12), "fail", store) == expected
+    assert find_levels(weapons, range(0, 13), store=store) != expected
+    assert store.info()[0] == 14
+
+
+def test_store_evicts_least_recently_used(cache, tmp_path):
+    weapons = list(Loader.load_weapons())
+    store = ResultStore(tmp_path / "results")
+    find_levels(weapons, range(0, 12), store=store)
+    count, size = store.info()
+    paths = sorted(path for path, _ in store.entries())
+    for age, path in enumerate(paths):
+        os.utime(path, (1000 + age, 1000 + age))
+    # The oldest entry survives once it has been read again.
+    assert store.get(paths[0].stem) is not None
+    store.max_bytes = size // 2
+    assert store.prune() > 0
+    assert store.info()[1] <= size // 2
+    assert paths[0].exists()
+    assert not paths[1].exists()
+
+
+def test_store_command(cache, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(ResultStore, "PATH", tmp_path / "results")
+    find_levels(list(Loader.load_weapons()), range(0, 5), store=ResultStore())
+    main(["store"])
+    assert capsys.readouterr().out.startswith("7 stored results")
+    main(["store", "clear"])
+    assert capsys.readouterr().out.startswith("Removed 7 stored results")
+    assert ResultStore().info() == (0, 0)
@@ -0,0 +1,165 @@
+import json
+import os
+
+import pytest
+
+from dark_souls.__main__ import BASE_LEVELS, find_levels, main
+from dark_souls.backends import BACKENDS
+from dark_souls.loaders import Loader
+from dark_souls.sweeps import (
+    STARTING_CLASSES,
+    BatchStats,
+    Checkpoint,
+    ShardDirectory,
+    find_levels_bases,
+    infusion_ars_entry,
+    merge_shards,
+    parse_shard,
+    run_sweep,
+    stream_ars,
+    work,
+)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_resumed_sweep_matches_uninterrupted(cache, tmp_path, monkeypatch):
+    weapons = list(Loader.load_weapons())
+    domain = range(0, 23)
+    expected = find_levels(weapons, domain)
+    calls = []
+    interrupt = [40]
+    search = BACKENDS["search"]
+
+    def flaky(infusion, levels, points):
+        calls.append(points)
+        if len(calls) == interrupt[0]:
+            raise Interrupted()
+        return search(infusion, levels, points)
+
+    monkeypatch.setitem(BACKENDS, "flaky", flaky)
+    checkpoint = Checkpoint(tmp_path / "sweep.jsonl")
+    with pytest.raises(Interrupted):
+        run_sweep(weapons, domain, BASE_LEVELS, checkpoint, 5, "flaky")
+    with checkpoint.path.open("a") as f:
+        f.write('{"key": ["1", "FI')
+
+    calls.clear()
+    interrupt[0] = None
+    levels = run_sweep(weapons, domain, BASE_LEVELS, checkpoint, 5, "flaky")
+    assert levels == expected
+    assert list(levels) == list(expected)
+    assert len(calls) == 7 * 23 - (23 + 15)
+
+    calls.clear()
+    assert run_sweep(weapons, domain, BASE_LEVELS, checkpoint, 5, "flaky") == expected
+    assert calls == []
+
+
+def _order(levels):
+    return [
+        (weapon_type, weapon, list(infusions))
+        for weapon_type, weapons in levels.items()
+        for weapon, infusions in weapons.items()
+    ]
+
+
+def test_levels_keep_catalogue_order(cache):
+    weapons = list(Loader.load_weapons())
+    domain = range(0, 10)
+    expected = {}
+    for weapon in weapons:
+        for _, _, infusion in weapon.max_level(BASE_LEVELS, 5):
+            infusion_ars_entry(expected, infusion, len(domain))
+    assert _order(find_levels(weapons, domain)) == _order(expected)
+    bases = find_levels_bases(weapons, domain, STARTING_CLASSES)
+    assert all(_order(levels) == _order(expected) for levels in bases.values())
+
+
+def test_checkpoint_rejects_other_parameters(cache, tmp_path):
+    weapons = list(Loader.load_weapons())
+    checkpoint = Checkpoint(tmp_path / "sweep.jsonl")
+    run_sweep(weapons, range(0, 5), BASE_LEVELS, checkpoint)
+    with pytest.raises(ValueError):
+        run_sweep(weapons, range(0, 6), BASE_LEVELS, checkpoint)
+
+
+def test_checkpoint_ignores_refreshed_catalogue(weapon_records, curves, tmp_path):
+    domain = range(0, 10)
+    checkpoint = Checkpoint(tmp_path / "sweep.jsonl")
+    run_sweep(
+        list(Loader.from_data(weapon_records, curves)), domain, BASE_LEVELS, checkpoint
+    )
+    refreshed = json.loads(json.dumps(weapon_records))
+    refreshed[0]["strength_req"] = 30
+    weapons = list(Loader.from_data(refreshed, curves))
+    levels = run_sweep(weapons, domain, BASE_LEVELS, checkpoint)
+    assert levels == find_levels(weapons, domain)
+
+
+def test_checkpoint_recovers_truncated_header(cache, tmp_path):
+    weapons = list(Loader.load_weapons())
+    checkpoint = Checkpoint(tmp_path / "sweep.jsonl")
+    for partial in ["", '{"budgets": [0, 1']:
+        checkpoint.path.write_text(partial)
+        levels = run_sweep(weapons, range(0, 5), BASE_LEVELS, checkpoint)
+        assert levels == find_levels(weapons, range(0, 5))
+        header = checkpoint.path.read_text().split("\n")[0]
+        assert json.loads(header)["budgets"] == [0, 1, 2, 3, 4]
+
+
+def test_shards_merge_to_single_node_levels(cache, tmp_path, monkeypatch):
+    weapons = list(Loader.load_weapons())
+    domain = range(0, 12)
+    shards = ShardDirectory(tmp_path / "shards", 3)
+
+    main(["shard", "1/3", "--dir", str(shards.path), "--levels", "12"])
+    assert shards.result_path(1).exists()
+    with pytest.raises(ValueError, match=r"shards \[0, 2\]"):
+        merge_shards(weapons, domain, BASE_LEVELS, shards)
+    with pytest.raises(SystemExit, match=r"shards \[0, 2\]"):
+        main(["merge", "3", "--dir", str(shards.path), "--levels", "12"])
+    beats = []
+    monkeypatch.setattr(shards, "heartbeat", beats.append)
+    assert work(weapons, domain, BASE_LEVELS, shards) == [0, 2]
+    assert beats and set(beats) <= {0, 2}
+    assert work(weapons, domain, BASE_LEVELS, shards) == []
+
+    expected = find_levels(weapons, domain)
+    levels = merge_shards(weapons, domain, BASE_LEVELS, shards)
+    assert levels == expected
+    assert json.dumps(levels) == json.dumps(expected)
+
+
+def test_shard_claims_are_exclusive(tmp_path):
+    shards = ShardDirectory(tmp_path, 2)
+    assert shards.claim(0)
+    assert not shards.claim(0)
+    assert shards.claim(0, stale=-1)
+    lock = tmp_path / "shard-0-of-2.lock"
+    os.utime(lock, (0, 0))
+    shards.heartbeat(0)
+    assert not shards.claim(0, stale=60)
+    os.utime(lock, (0, 0))
+    assert shards.claim(0, stale=60)
+    assert [path.name for path in tmp_path.iterdir()] == [lock.name]
+    assert parse_shard("1/2") == (1, 2)
+    with pytest.raises(ValueError):
+        parse_shard("2/2")
+
+
+def test_find_levels_bases_matches_each_base(cache):
+    weapons = list(Loader.load_weapons())
+    domain = range(0, 25)
+    bases = dict(STARTING_CLASSES, Custom=(40, 40, 8, 9, 99))
+    stats = BatchStats()
+    results = find_levels_bases(weapons, domain, bases, stats=stats)
+    for name, levels in bases.items():
+        expected = {}
+        for infusion, ars in stream_ars(weapons, domain, levels):
+            infusion_ars_entry(expected, infusion, len(domain))[:] = ars
+        assert results[name] == expected
+    assert stats.requested == 7 * 25 * len(bases)
+    assert stats.evaluated < stats.requested
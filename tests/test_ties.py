@@ -0,0 +1,42 @@
+import itertools
+
+from dark_souls.new_alg import max_levels
+from dark_souls.ties import Ties, TiesUnion
+
+
+def test_ties_is_lazy_product():
+    ties = Ties([[(1,)], [(2, 3), (4, 5)], [(6, 7), (8, 9), (0, 1)]])
+    assert len(ties) == 6
+    assert ties.take(2) == [(1, 2, 3, 6, 7), (1, 2, 3, 8, 9)]
+    assert [ties[i] for i in range(len(ties))] == list(ties)
+    assert ties[-1] == (1, 4, 5, 0, 1)
+
+
+def test_ties_union_chains_products():
+    ties = TiesUnion([Ties([[(1,)], [(2,), (3,)]]), Ties([[(4,)], [(5,)]])])
+    assert len(ties) == 3
+    assert list(ties) == [(1, 2), (1, 3), (4, 5)]
+    assert [ties[i] for i in range(-3, 3)] == list(ties) * 2
+
+
+def test_max_levels_matches_brute_force():
+    curves = [
+        {i: v for i, v in enumerate([0, 2, 4, 5, 6])},
+        [0, 1, 2, 2, 2],
+        [0, 1, 2, 3, 3],
+        [0, 2, 2, 2, 2],
+        [0, 1, 1, 2, 2],
+    ]
+    for n, (total, ties) in enumerate(max_levels(4, curves)):
+        allocations = [
+            levels
+            for levels in itertools.product(range(5), repeat=5)
+            if sum(levels) == n
+        ]
+        best = max(sum(c[i] for c, i in zip(curves, a)) for a in allocations)
+        expected = [
+            a for a in allocations if sum(c[i] for c, i in zip(curves, a)) == best
+        ]
+        assert total == best
+        assert len(ties) == len(expected)
+        assert sorted(ties) == expected
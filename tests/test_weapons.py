@@ -0,0 +1,32 @@
+from dark_souls.__main__ import find_levels
+from dark_souls.loaders import Loader
+from dark_souls.weapons import dedup_ratio, group_infusions
+
+
+def test_group_infusions_shares_numerically_identical_infusions(cache):
+    weapons = list(Loader.load_weapons())
+    groups = group_infusions(weapons)
+    assert sum(map(len, groups.values())) == 9
+    assert len(groups) == 7
+    assert dedup_ratio(groups) == 1 - 7 / 9
+
+
+def test_find_levels_fans_out_shared_results(cache):
+    weapons = list(Loader.load_weapons())
+    levels = find_levels(weapons, range(0, 12))
+    katanas = levels["KATANA"]
+    assert katanas["Black Blade"] == {
+        name: katanas["Uchigatana"][name] for name in ("NONE", "SHARP")
+    }
+    for weapon in weapons:
+        for infusion in weapon.infusions:
+            if infusion is None:
+                continue
+            expected = [
+                infusion.max_ar((10, 10, 10, 10, 10), level) or None
+                for level in range(0, 12)
+            ]
+            assert (
+                levels[weapon.type.name][weapon.name][infusion.infusion.name]
+                == expected
+            )